@@ -4,20 +4,44 @@ Weather helper for the Hypr Waybar configuration.
 Defaults for location, city label, and unit system live here as a single edit point.
 Hypr env vars (WAYBAR_WEATHER_LOCATION / WAYBAR_WEATHER_SHOW_CITY / WAYBAR_WEATHER_UNITS)
 override these defaults when needed.
-The script prints a tiny JSON object for the Waybar custom/weather module.
+The script prints a tiny JSON object for the Waybar custom/weather module
+(once per call, or once per refresh interval with --daemon).
+Responses are cached under $XDG_CACHE_HOME/hypr/weather so refreshes rarely touch the network.
 """
 
 from __future__ import annotations
 
-import json
+import contextlib
+import functools
+import hashlib
 import os
+import re
+import string
 import sys
-import urllib.error
-import urllib.parse
-import urllib.request
-from dataclasses import dataclass
-from datetime import datetime
-from typing import Literal
+import time
+import zlib
+from collections.abc import Iterator
+from pathlib import Path
+from typing import TYPE_CHECKING, Literal, NamedTuple
+
+if TYPE_CHECKING:
+    import ssl
+
+try:
+    # orjson parses from / serializes to bytes and is noticeably faster; stdlib json stays the fallback
+    import orjson
+
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+except ImportError:
+    # stdlib json is only imported when orjson is missing
+    import json
+
+    _loads = json.loads
+
+    def _dumps(obj: object) -> bytes:
+        # same compact, non-ASCII-escaping output orjson produces
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
 
 # ----------------------------
 # defaults intended for local override
@@ -31,17 +55,58 @@ ENV_LOCATION = "WAYBAR_WEATHER_LOCATION"
 ENV_SHOW_CITY = "WAYBAR_WEATHER_SHOW_CITY"
 ENV_UNITS = "WAYBAR_WEATHER_UNITS"
 
-
-@dataclass(frozen=True)
-class Settings:
+# accepted env spellings, built once instead of as set literals on every call
+LOCATION_PLACEHOLDERS = frozenset({"city, state", "city,state"})
+TRUE_VALUES = frozenset({"1", "true", "yes"})
+FALSE_VALUES = frozenset({"0", "false", "no"})
+METRIC_VALUES = frozenset({"metric", "c", "celsius"})
+IMPERIAL_VALUES = frozenset({"imperial", "f", "fahrenheit"})
+
+WTTR_HOST = "wttr.in"
+CACHE_TTL_SECONDS = 600  # wttr.in only refreshes observations roughly every 30 minutes
+DAEMON_INTERVAL_SECONDS = 900  # --daemon refresh cadence (the old Waybar interval)
+
+# characters quote_plus(safe=",") leaves alone (space becomes '+'), for the no-escaping fast path
+_URL_PLAIN_CHARS = frozenset(string.ascii_letters + string.digits + ",-_.~ ")
+
+MOON_ICONS = {
+    "New Moon": "🌑",
+    "Waxing Crescent": "🌒",
+    "First Quarter": "🌓",
+    "Waxing Gibbous": "🌔",
+    "Full Moon": "🌕",
+    "Waning Gibbous": "🌖",
+    "Last Quarter": "🌗",
+    "Third Quarter": "🌗",
+    "Waning Crescent": "🌘",
+}
+
+# condition keywords in priority order; the first group that matches anywhere wins
+CONDITION_KEYWORDS: tuple[tuple[str, tuple[str, ...]], ...] = (
+    ("⛈️", ("thunderstorm", "storm")),
+    ("❄️", ("snow", "sleet", "blizzard")),
+    ("🌧️", ("rain", "drizzle", "shower")),
+    ("🌫️", ("fog", "mist", "haze")),
+    ("☁️", ("cloud", "overcast")),
+    ("☀️", ("clear", "sun")),
+)
+_CONDITION_RANK = {
+    keyword: rank
+    for rank, (_icon, keywords) in enumerate(CONDITION_KEYWORDS)
+    for keyword in keywords
+}
+# one alternation scans the description once instead of ~15 separate substring searches
+_CONDITION_RE = re.compile("|".join(sorted(_CONDITION_RANK, key=len, reverse=True)))
+
+
+class Settings(NamedTuple):
     # wraps the resolved location, city toggle, and unit system so downstream code stays tidy
     location: str
     show_city: bool
     units: Literal["imperial", "metric"]
 
 
-@dataclass(frozen=True)
-class WeatherReading:
+class WeatherReading(NamedTuple):
     # holds the parsed values we actually render in Waybar (emoji + temp + optional label)
     temp_text: str
     condition: str
@@ -50,34 +115,64 @@ class WeatherReading:
     location_label: str
 
 
+class WeatherError(Exception):
+    # raised for fetch/parse failures; the message is what Waybar should display
+    pass
+
+
+def encode_line(text: str) -> bytes:
+    # one Waybar JSON line; _dumps is the single encoder whether or not orjson is installed
+    return _dumps({"text": text}) + b"\n"
+
+
+def write_line(line: bytes) -> None:
+    # flush every line so --daemon output reaches the bar immediately
+    sys.stdout.buffer.write(line)
+    sys.stdout.flush()
+
+
+def emit(text: str) -> None:
+    # write one Waybar JSON line for the given display text
+    write_line(encode_line(text))
+
+
 def error_exit(message: str) -> None:
     # print a failure message so Waybar shows the outage instead of stale data
-    safe = message.replace("\\", "\\\\").replace('"', '\\"')
-    sys.stdout.write(f'{{"text":"{safe}"}}\n')
+    emit(message)
     sys.exit(0)
 
 
 def load_settings() -> Settings:
     # pull defaults plus env overrides into one Settings object
-    env_loc = os.environ.get(ENV_LOCATION, "").strip()
+    return resolve_settings(
+        os.environ.get(ENV_LOCATION, ""),
+        os.environ.get(ENV_SHOW_CITY, ""),
+        os.environ.get(ENV_UNITS, ""),
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def resolve_settings(env_loc: str, env_city: str, env_units: str) -> Settings:
+    # memoized on the raw env values so repeated calls (e.g. per daemon tick) skip the parsing
+    env_loc = env_loc.strip()
     # prefer user-provided env location, otherwise fall back to the default above
     location = env_loc if env_loc else DEFAULT_LOCATION.strip()
-    if not location or location.lower() == "city, state":
+    if not location or location.lower() in LOCATION_PLACEHOLDERS:
         error_exit("Set WAYBAR_WEATHER_LOCATION for weather")
 
-    env_city = os.environ.get(ENV_SHOW_CITY, "").strip().lower()
-    if env_city in {"1", "true", "yes"}:
+    env_city = env_city.strip().lower()
+    if env_city in TRUE_VALUES:
         show_city = True
-    elif env_city in {"0", "false", "no"}:
+    elif env_city in FALSE_VALUES:
         show_city = False
     else:
         show_city = bool(DEFAULT_SHOW_CITY)
 
-    env_units = os.environ.get(ENV_UNITS, "").strip().lower()
+    env_units = env_units.strip().lower()
     # respect explicit unit request; otherwise use the default for the entire script
-    if env_units in {"metric", "c", "celsius"}:
+    if env_units in METRIC_VALUES:
         units = "metric"
-    elif env_units in {"imperial", "f", "fahrenheit"}:
+    elif env_units in IMPERIAL_VALUES:
         units = "imperial"
     else:
         units = DEFAULT_UNITS
@@ -85,21 +180,214 @@ def load_settings() -> Settings:
     return Settings(location=location, show_city=show_city, units=units)
 
 
+def cache_path(location: str) -> Path:
+    # one cache file per location so switching WAYBAR_WEATHER_LOCATION never serves stale cities
+    # the cache dir comes from the environment, so its inputs are part of the memo key
+    return _cache_path(location, os.environ.get("XDG_CACHE_HOME", ""), os.environ.get("HOME", ""))
+
+
+@functools.lru_cache(maxsize=4)
+def _cache_path(location: str, xdg_cache_home: str, home: str) -> Path:
+    # home only keys the memo; Path.home() reads the same variable
+    key = hashlib.sha1(location.encode("utf-8")).hexdigest()
+    base = Path(xdg_cache_home or Path.home() / ".cache")
+    return base / "hypr" / "weather" / f"{key}.json"
+
+
+def output_cache_path(settings: Settings) -> Path:
+    # the rendered line also depends on units and the city toggle, so they are part of the key
+    return _output_cache_path(settings, cache_path(settings.location))
+
+
+@functools.lru_cache(maxsize=4)
+def _output_cache_path(settings: Settings, data_path: Path) -> Path:
+    raw = f"{settings.location}\0{settings.units}\0{int(settings.show_city)}"
+    key = hashlib.sha1(raw.encode("utf-8")).hexdigest()
+    return data_path.with_name(f"{key}.out")
+
+
+def read_cache(path: Path) -> dict | None:
+    # load the cache entry ({etag, last_modified, fetched_at, body}) or None when unusable
+    try:
+        entry = _loads(path.read_bytes())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(entry, dict) or not isinstance(entry.get("body"), dict):
+        return None
+    return entry
+
+
+def cache_is_fresh(entry: dict) -> bool:
+    # fetched_at is stored in the entry so 304 revalidations can extend it without new bytes
+    try:
+        return time.time() - float(entry.get("fetched_at", 0)) < CACHE_TTL_SECONDS
+    except (TypeError, ValueError):
+        return False
+
+
+def write_cache(path: Path, entry: dict) -> None:
+    # persist one cache entry; see write_atomic for the failure handling
+    write_atomic(path, _dumps(entry))
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    # write via temp file + rename so a concurrent reader never sees a half-written cache
+    import tempfile  # only needed on the (rare) write path
+
+    tmp_name = None
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as tmp:
+            tmp.write(data)
+        os.replace(tmp_name, path)
+    except OSError:
+        # caching is best-effort; a read-only cache dir must not break the widget
+        if tmp_name is not None:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+
+
+def trim_payload(data: dict) -> dict:
+    # keep only the leaves parse_reading reads; j1 also ships hourly forecasts for three days
+    current = (data.get("current_condition") or [{}])[0]
+    weather = (data.get("weather") or [{}])[0]
+    astronomy = (weather.get("astronomy") or [{}])[0]
+    return {
+        "current_condition": [
+            {
+                key: current[key]
+                for key in ("temp_C", "temp_F", "weatherDesc", "localObsDateTime")
+                if key in current
+            }
+        ],
+        "weather": [{"astronomy": [{"moon_phase": astronomy.get("moon_phase", "")}]}],
+    }
+
+
+def quote_location(location: str) -> str:
+    # same result as quote_plus(location, safe=","); plain ASCII names skip the Quoter entirely
+    if _URL_PLAIN_CHARS.issuperset(location):
+        return location.replace(" ", "+")
+    import urllib.parse
+
+    return urllib.parse.quote_plus(location, safe=",")
+
+
+@functools.lru_cache(maxsize=1)
+def ssl_context() -> ssl.SSLContext:
+    # loading the CA bundle is the priciest part of TLS setup; build it once per process
+    import ssl
+
+    return ssl.create_default_context()
+
+
+def decompress(payload: bytes, encoding: str) -> bytes:
+    # undo Content-Encoding; zlib handles both gzip framing and deflate (wrapped or raw)
+    if encoding == "gzip":
+        return zlib.decompress(payload, 16 + zlib.MAX_WBITS)
+    if encoding == "deflate":
+        try:
+            return zlib.decompress(payload)
+        except zlib.error:
+            return zlib.decompress(payload, -zlib.MAX_WBITS)
+    return payload
+
+
+@contextlib.contextmanager
+def cache_lock(path: Path) -> Iterator[None]:
+    # exclusive flock next to the cache file so only one process refreshes it at a time
+    import fcntl
+
+    fd = None
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(path.with_suffix(".lock"), os.O_CREAT | os.O_RDWR, 0o600)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+    except OSError:
+        # locking only dedupes requests; an unusable cache dir just means fetching unlocked
+        pass
+    try:
+        yield
+    finally:
+        if fd is not None:
+            os.close(fd)  # closing the descriptor releases the lock
+
+
 def fetch_weather_json(location: str) -> dict:
-    # call wttr.in JSON API for the resolved location and fail fast on errors
-    encoded = urllib.parse.quote_plus(location, safe=",")
-    url = f"https://wttr.in/{encoded}?format=j1"
+    # serve a fresh cache hit, otherwise revalidate with wttr.in and fall back to stale data on errors
+    path = cache_path(location)
+    entry = read_cache(path)
+    if entry is not None and cache_is_fresh(entry):
+        return entry["body"]
+
+    # concurrent bar instances queue up here; whoever waited re-checks and reuses the winner's fetch
+    with cache_lock(path):
+        entry = read_cache(path)
+        if entry is not None and cache_is_fresh(entry):
+            return entry["body"]
+        return refresh_weather_json(location, path, entry)
+
+
+def refresh_weather_json(location: str, path: Path, entry: dict | None) -> dict:
+    # a bare http.client GET skips urllib's handler/cookie/email machinery; cache hits import neither
+    import http.client
+
+    encoded = quote_location(location)
+    headers = {
+        "User-Agent": "waybar-weather",
+        "Accept": "application/json",
+        "Accept-Encoding": "gzip, deflate",  # j1 JSON compresses several times over
+        "Connection": "close",
+    }
+    if entry is not None:
+        # conditional GET: an unchanged report comes back as a body-less 304
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+    conn = http.client.HTTPSConnection(WTTR_HOST, timeout=8, context=ssl_context())
     try:
-        with urllib.request.urlopen(url, timeout=8) as resp:
-            payload = resp.read().decode("utf-8", errors="replace")
-    except (urllib.error.URLError, TimeoutError, OSError) as exc:
-        error_exit(f"Weather: provider down ({exc.__class__.__name__})")
+        conn.request("GET", f"/{encoded}?format=j1", headers=headers)
+        resp = conn.getresponse()
+        payload = resp.read()  # keep raw bytes; both parsers accept them without a decode pass
+        encoding = (resp.getheader("Content-Encoding") or "").strip().lower()
+        etag = resp.getheader("ETag")
+        last_modified = resp.getheader("Last-Modified")
+    except (http.client.HTTPException, OSError) as exc:
+        if entry is not None:
+            return entry["body"]
+        raise WeatherError(f"Weather: provider down ({exc.__class__.__name__})") from exc
+    finally:
+        conn.close()
+
+    if resp.status != 200:
+        if entry is None:
+            raise WeatherError(f"Weather: provider down (HTTP {resp.status})")
+        if resp.status == 304:
+            entry["fetched_at"] = time.time()
+            write_cache(path, entry)
+        return entry["body"]
 
     try:
-        return json.loads(payload)  # the response is tiny, so reading it fully is fine
-    except json.JSONDecodeError:
-        error_exit("Weather: provider returned malformed JSON")
-    return {}
+        data = _loads(decompress(payload, encoding))  # the response is tiny, so reading it fully is fine
+    except (ValueError, zlib.error) as exc:  # bad JSON, bad UTF-8 or a corrupt compressed body
+        if entry is not None:
+            return entry["body"]
+        raise WeatherError("Weather: provider returned malformed JSON") from exc
+    if not isinstance(data, dict):
+        # valid JSON of the wrong shape is as unusable as a parse failure
+        if entry is not None:
+            return entry["body"]
+        raise WeatherError("Weather: provider returned malformed JSON")
+    data = trim_payload(data)
+    write_cache(
+        path,
+        {"etag": etag, "last_modified": last_modified, "fetched_at": time.time(), "body": data},
+    )
+    return data
 
 
 def parse_reading(data: dict, settings: Settings) -> WeatherReading:
@@ -116,7 +404,7 @@ def parse_reading(data: dict, settings: Settings) -> WeatherReading:
         unit_suffix = "°F"
 
     if not temp_raw:
-        error_exit("Weather: missing temperature")
+        raise WeatherError("Weather: missing temperature")
 
     # format temperature for display; drop leading '+' but retain '-' for negative temps
     temp_text = temp_raw.lstrip("+") + unit_suffix
@@ -136,50 +424,36 @@ def parse_reading(data: dict, settings: Settings) -> WeatherReading:
 
 def determine_night(local_str: str) -> bool:
     # treat the location's local time between 20:00-06:59 as night so we can use moon icons
+    # localObsDateTime looks like "2024-01-15 09:30 PM"; only the hour and AM/PM matter,
+    # so split it by hand instead of paying for strptime's format/locale machinery
     try:
-        dt = datetime.strptime(local_str, "%Y-%m-%d %I:%M %p")
+        _date, clock, meridiem = local_str.split(" ")
+        hour = int(clock.partition(":")[0])
     except ValueError:
         return False
-    return dt.hour >= 20 or dt.hour < 7
+    meridiem = meridiem.upper()
+    if not 1 <= hour <= 12 or meridiem not in ("AM", "PM"):
+        return False
+    hour = hour % 12 + (12 if meridiem == "PM" else 0)
+    return hour >= 20 or hour < 7
 
 
 def moon_icon(moon_phase: str) -> str:
     # map textual moon phase to the closest Unicode moon glyph
-    phase_lower = moon_phase.lower()
-    if "new" in phase_lower:
-        return "🌑"
-    if "waxing crescent" in phase_lower:
-        return "🌒"
-    if "first quarter" in phase_lower:
-        return "🌓"
-    if "waxing gibbous" in phase_lower:
-        return "🌔"
-    if "full" in phase_lower:
-        return "🌕"
-    if "waning gibbous" in phase_lower:
-        return "🌖"
-    if "last quarter" in phase_lower or "third quarter" in phase_lower:
-        return "🌗"
-    if "waning crescent" in phase_lower:
-        return "🌘"
-    return "🌙"
+    # wttr.in only reports a handful of fixed phase names, so an exact lookup covers them
+    icon = MOON_ICONS.get(moon_phase)
+    if icon is None:
+        icon = MOON_ICONS.get(moon_phase.title(), "🌙")
+    return icon
 
 
 def condition_icon(description: str, is_night: bool, moon_phase: str) -> str:
     # map the text condition (rain, snow, clear, etc.) to one emoji
-    dl = description.lower()
-    if "thunderstorm" in dl or "storm" in dl:
-        return "⛈️"
-    if "snow" in dl or "sleet" in dl or "blizzard" in dl:
-        return "❄️"
-    if "rain" in dl or "drizzle" in dl or "shower" in dl:
-        return "🌧️"
-    if "fog" in dl or "mist" in dl or "haze" in dl:
-        return "🌫️"
-    if "cloud" in dl or "overcast" in dl:
-        return "☁️"
-    if "clear" in dl or "sun" in dl:
-        return moon_icon(moon_phase) if is_night else "☀️"
+    ranks = [_CONDITION_RANK[match] for match in _CONDITION_RE.findall(description.lower())]
+    if ranks:
+        icon = CONDITION_KEYWORDS[min(ranks)][0]
+        # clear skies at night show the moon instead of the sun
+        return moon_icon(moon_phase) if icon == "☀️" and is_night else icon
     return moon_icon(moon_phase) if is_night else "🌡️"
 
 
@@ -192,15 +466,64 @@ def format_output(settings: Settings, reading: WeatherReading) -> str:
     return f"{icon} {reading.temp_text}"
 
 
+def render(settings: Settings) -> str:
+    # one full refresh: cached-or-fetched data -> reading -> display text
+    data = fetch_weather_json(settings.location)
+    reading = parse_reading(data, settings)
+    return format_output(settings, reading)
+
+
+def output_line(settings: Settings) -> bytes:
+    # the finished line is cached too; a fresh hit skips JSON parsing and icon lookups entirely
+    path = output_cache_path(settings)
+    try:
+        if time.time() - path.stat().st_mtime < CACHE_TTL_SECONDS:
+            line = path.read_bytes()
+            if line.endswith(b"\n"):
+                return line
+    except OSError:
+        pass
+    line = encode_line(render(settings))
+    # only a line rendered from a fresh (fetched or revalidated) entry may be reused; a line
+    # built from the stale fallback must not hide the expired entry from the next run
+    entry = read_cache(cache_path(settings.location))
+    if entry is not None and cache_is_fresh(entry):
+        write_atomic(path, line)
+    return line
+
+
+def run_daemon(settings: Settings) -> None:
+    # keep one interpreter alive and print a fresh line per tick; Waybar reads lines as they arrive
+    while True:
+        try:
+            line = output_line(settings)
+        except WeatherError as exc:
+            # outages are shown for one tick instead of killing the long-lived process
+            line = encode_line(str(exc))
+        except Exception as exc:
+            # a malformed payload or cache failure must not end the daemon either
+            line = encode_line(f"Weather: error ({exc.__class__.__name__})")
+        try:
+            write_line(line)
+        except BrokenPipeError:
+            # Waybar went away (reload/exit); nothing is left to print to
+            return
+        time.sleep(DAEMON_INTERVAL_SECONDS)
+
+
 def main() -> None:
     # load settings, fetch data, format, and print the JSON payload
     settings = load_settings()
-    # the fetch/parse steps intentionally exit with informative errors instead of caching
-    data = fetch_weather_json(settings.location)
-    reading = parse_reading(data, settings)
-    text = format_output(settings, reading)
-    safe = text.replace("\\", "\\\\").replace('"', '\\"')
-    sys.stdout.write(f'{{"text":"{safe}"}}\n')
+    if "--daemon" in sys.argv[1:]:
+        # settings come from Waybar's environment, so resolving them once covers every tick
+        run_daemon(settings)
+        return
+    # cached output/data is served when fresh; we only exit with an error when nothing usable exists
+    try:
+        line = output_line(settings)
+    except WeatherError as exc:
+        error_exit(str(exc))
+    write_line(line)
 
 
 if __name__ == "__main__":
@@ -9,14 +9,31 @@ Outputs (relative to this directory's parent):
 
 The images are transparent everywhere except for the stars so the bar background can remain
 fully invisible while stars render as a subtle overlay.
+
+Requires Pillow and NumPy (stars are stamped into NumPy buffers; Pillow handles blur/compositing).
+
+Pass `--release` when regenerating the committed assets (slow, smallest PNGs); the default run
+uses fast zlib settings (level from `STARLIGHT_PNG_COMPRESS`, default 1) and produces the same
+pixels.
 """
 
 from __future__ import annotations
 
+import argparse
+import functools
+import hashlib
 import math
+import os
 import random
+import struct
+import sys
+import zlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
+from typing import BinaryIO, NamedTuple
 
+import numpy as np
+import PIL
 from PIL import Image, ImageDraw, ImageFilter
 
 
@@ -100,21 +117,330 @@ EDGE_FADE_STRENGTH = 0.18  # 0.0 disables the fade; 1.0 applies the full smooths
 # Seed is fixed for stable visuals across regenerations.
 BASE_SEED = 1731
 
+# Poisson candidates are drawn from the RNG in blocks of this many (x, y) pairs.
+POISSON_CANDIDATE_BATCH = 4096
+# 5x5 cell neighborhood (cell = min_dist / sqrt(2)), nearest cells first.
+POISSON_NEIGHBOR_OFFSETS = tuple(
+    sorted(((ox, oy) for oy in range(-2, 3) for ox in range(-2, 3)), key=lambda o: o[0] * o[0] + o[1] * o[1])
+)
+# Random sequential adsorption jams at ~54.7% disk coverage; asking for more points than that
+# from an empty band can never succeed.
+POISSON_JAMMING_DENSITY = 0.547
+# Grid step for the "band fully covered" check that lets saturated samplers stop early.
+POISSON_COVER_STEP_PX = 1.0
+
+# Transparent border kept around a starfield's stars so the glow blur never reaches the edge of
+# the rendered box (Pillow's GaussianBlur(0.75) spreads a pixel by 2 px).
+STARFIELD_BLUR_MARGIN_PX = 4
+
+# Twinkle star styles (`TwinkleStars.style`):
+# - normal: standard core + glow
+# - sparkle: standard core + glow + subtle flare
+# - macro: larger/brighter hero stars (still fading in/out)
+STYLE_NORMAL = 0
+STYLE_SPARKLE = 1
+STYLE_MACRO = 2
+
+# Twinkle roles assigned in `main()` (per rounded pixel; see `_twinkle_role_grid`). Any point
+# without an explicit role is scheduled as a main or micro twinkle.
+ROLE_OTHER = 0
+ROLE_ANCHOR = 1
+ROLE_MACRO = 2
+ROLE_SPARKLE = 3
+
+
+class TwinkleStars(NamedTuple):
+    """
+    Twinkle stars as parallel arrays (one entry per star) plus a flat event list.
 
-def _edge_fade_alpha(x01: float) -> float:
+    Star i owns events `event_start[i]` up to `event_start[i + 1]` (or the end of the list).
     """
-    Fade star alpha towards the edges (x01 in [0, 1]).
+
+    x: np.ndarray  # int64 pixel column
+    y: np.ndarray  # int64 pixel row
+    fade: np.ndarray  # float64 edge fade
+    peak_alpha: np.ndarray  # int64
+    glow_r: np.ndarray  # int64 glow radius in px
+    power: np.ndarray  # float64 envelope exponent
+    style: np.ndarray  # int8 STYLE_* code
+    event_start: np.ndarray  # int64 index of the star's first event
+    event_center: np.ndarray  # float64 normalized time [0, 1]
+    event_half_width: np.ndarray  # float64 normalized time
+
+
+# Flare pixels painted around a twinkle core, per style: (dx, dy, alpha_scale, alpha_cap).
+# - macro: multi-point flare so hero stars read as "hero" points
+# - sparkle: subtle 4-point flare that reads as a premium glint rather than a distracting "spark"
+# Caps keep either from turning into a distracting sparkle pattern.
+TWINKLE_FLARES: dict[int, tuple[tuple[int, int, float, int], ...]] = {
+    STYLE_NORMAL: (),
+    STYLE_SPARKLE: ((-2, 0, 0.35, 70), (2, 0, 0.35, 70), (0, -2, 0.35, 70), (0, 2, 0.35, 70)),
+    STYLE_MACRO: (
+        (-3, 0, 0.45, 110),
+        (3, 0, 0.45, 110),
+        (0, -3, 0.45, 110),
+        (0, 3, 0.45, 110),
+        (-2, -2, 0.28, 70),
+        (2, -2, 0.28, 70),
+        (-2, 2, 0.28, 70),
+        (2, 2, 0.28, 70),
+    ),
+}
+
+
+def _edge_fade_alpha(x01: np.ndarray) -> np.ndarray:
+    """
+    Fade star alpha towards the edges (x01 in [0, 1]), for a whole array of stars at once.
     """
 
     if EDGE_FADE_STRENGTH <= 0.0:
-        return 1.0
+        return np.ones_like(x01, dtype=np.float64)
 
     # Smoothstep from center to edges; keeps the middle slightly stronger.
-    dist = abs(x01 - 0.5) * 2.0  # 0 at center, 1 at edges
+    dist = np.abs(x01 - 0.5) * 2.0  # 0 at center, 1 at edges
     fade = 1.0 - (dist * dist * (3.0 - 2.0 * dist))  # smoothstep
     return 1.0 - EDGE_FADE_STRENGTH * (1.0 - fade)
 
 
+@functools.cache
+def _disk_offsets(radius: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Pixel offsets covered by `ImageDraw.ellipse` for a (2r+1)-wide box (radius 0 is one pixel).
+
+    The footprint is rasterized by Pillow once, so stamped disks match the old per-star draws.
+    """
+
+    if radius <= 0:
+        return np.zeros(1, np.int64), np.zeros(1, np.int64)
+    size = 2 * radius + 1
+    mask = Image.new("L", (size, size), 0)
+    ImageDraw.Draw(mask).ellipse((0, 0, size - 1, size - 1), fill=255)
+    dy, dx = np.nonzero(np.asarray(mask))
+    return dx - radius, dy - radius
+
+
+def _paint_disks(canvas: np.ndarray, ops: list[tuple[int, ...]] | np.ndarray) -> None:
+    """
+    Paint flat-colored disks into an (H, W) or (H, W, C) uint8 canvas.
+
+    ops: (x, y, radius, *channels) in draw order, one value per canvas channel (e.g. r, g, b, a);
+    radius 0 paints a single pixel.
+    Pixels are overwritten (not blended) and later ops win, exactly like sequential
+    `ImageDraw.ellipse`/`point` calls, but all stars are written with a few array operations.
+    """
+
+    if len(ops) == 0:
+        return
+
+    height, width = canvas.shape[:2]
+    table = np.asarray(ops, dtype=np.int64)
+    xs, ys, radii = table[:, 0], table[:, 1], table[:, 2]
+    colors = table[:, 3:].astype(np.uint8)
+
+    op_parts: list[np.ndarray] = []
+    pixel_parts: list[np.ndarray] = []
+    for radius in np.unique(radii):
+        sel = np.flatnonzero(radii == radius)
+        dx, dy = _disk_offsets(int(radius))
+        px = xs[sel, None] + dx[None, :]
+        py = ys[sel, None] + dy[None, :]
+        inside = (px >= 0) & (px < width) & (py >= 0) & (py < height)
+        op_parts.append(np.broadcast_to(sel[:, None], px.shape)[inside])
+        pixel_parts.append((py * width + px)[inside])
+
+    op_index = np.concatenate(op_parts)
+    pixels = np.concatenate(pixel_parts)
+    # Stable sort by op index keeps draw order; repeated fancy-index writes keep the last value.
+    order = np.argsort(op_index, kind="stable")
+    canvas.reshape(height * width, -1)[pixels[order]] = colors[op_index[order]]
+
+
+def _mt19937_mirror(rng: random.Random) -> np.random.MT19937:
+    """
+    NumPy MT19937 bit generator holding the same Mersenne Twister state as `rng`.
+
+    `random.Random` is MT19937 too, so bulk draws from the mirror reproduce the exact stream the
+    scalar calls would have produced; seeds (and therefore visuals) stay stable.
+    """
+
+    _version, internal, _gauss_next = rng.getstate()
+    bit_gen = np.random.MT19937()
+    bit_gen.state = {
+        "bit_generator": "MT19937",
+        "state": {"key": np.asarray(internal[:-1], dtype=np.uint32), "pos": internal[-1]},
+    }
+    return bit_gen
+
+
+def _mt19937_sync(rng: random.Random, bit_gen: np.random.MT19937) -> None:
+    """
+    Move `rng` to the mirror's current position so later scalar draws continue the same stream.
+    """
+
+    state = bit_gen.state["state"]
+    rng.setstate((3, tuple(int(word) for word in state["key"]) + (int(state["pos"]),), None))
+
+
+def _mt19937_doubles(bit_gen: np.random.MT19937, count: int) -> np.ndarray:
+    """
+    `count` doubles in [0, 1) built exactly like `random.Random.random()` (two 32-bit words each).
+    """
+
+    words = bit_gen.random_raw(2 * count)
+    hi = (words[0::2] >> np.uint64(5)).astype(np.float64)
+    lo = (words[1::2] >> np.uint64(6)).astype(np.float64)
+    return (hi * 67108864.0 + lo) * (1.0 / 9007199254740992.0)
+
+
+def _cell_table(points: np.ndarray, *, cell_size: float, grid_w: int, grid_h: int) -> np.ndarray:
+    """
+    Flat grid of point coordinates: (grid_w * grid_h, slots, 2) float64, padded with +inf.
+
+    Pre-seeded points may come from a sampler with a smaller spacing, so a cell can hold more than
+    one point; the slot count adapts to the fullest cell.
+    """
+
+    if len(points) == 0:
+        return np.full((grid_w * grid_h, 1, 2), np.inf)
+
+    cells = (points[:, 1] / cell_size).astype(np.int64) * grid_w + (points[:, 0] / cell_size).astype(
+        np.int64
+    )
+    order = np.argsort(cells, kind="stable")
+    cells = cells[order]
+    counts = np.bincount(cells, minlength=grid_w * grid_h)
+    first = np.cumsum(counts) - counts
+    slot = np.arange(len(cells)) - first[cells]
+
+    table = np.full((grid_w * grid_h, int(counts.max()), 2), np.inf)
+    table[cells, slot] = points[order]
+    return table
+
+
+def _blocked_by_table(
+    xs: np.ndarray,
+    ys: np.ndarray,
+    table: np.ndarray,
+    *,
+    cell_size: float,
+    grid_w: int,
+    grid_h: int,
+    min_dist_sq: float,
+) -> np.ndarray:
+    """
+    Vectorized 5x5-neighborhood distance test of many candidates against a `_cell_table`.
+
+    Returns a bool mask of candidates closer than the minimum distance to any tabled point.
+    Cells are visited nearest-first and blocked candidates drop out, so in crowded bands most
+    candidates are settled by the first few cells.
+    """
+
+    gx = (xs / cell_size).astype(np.int64)
+    gy = (ys / cell_size).astype(np.int64)
+    blocked = np.zeros(len(xs), dtype=bool)
+    pending = np.arange(len(xs))
+    for ox, oy in POISSON_NEIGHBOR_OFFSETS:
+        if len(pending) == 0:
+            break
+        nx = gx[pending] + ox
+        ny = gy[pending] + oy
+        valid = (nx >= 0) & (nx < grid_w) & (ny >= 0) & (ny < grid_h)
+        neighbors = table[np.where(valid, ny * grid_w + nx, 0)]  # (n, slots, 2); +inf never blocks
+        dx = xs[pending, None] - neighbors[:, :, 0]
+        dy = ys[pending, None] - neighbors[:, :, 1]
+        near = ((dx * dx + dy * dy) < min_dist_sq).any(axis=1) & valid
+        blocked[pending[near]] = True
+        pending = pending[~near]
+    return blocked
+
+
+def _cover_geometry(
+    *, x_lo: float, x_hi: float, y_lo: float, y_hi: float, min_dist_px: float
+) -> tuple[int, int, float, float, float]:
+    """
+    Cell grid for coverage masks: (nx, ny, step_x, step_y, reach).
+
+    A cell is certainly covered by a point within `reach` (min_dist minus the cell half diagonal,
+    with a little slack for rounding) of its center.
+    """
+
+    nx = max(1, int(math.ceil((x_hi - x_lo) / POISSON_COVER_STEP_PX)))
+    ny = max(1, int(math.ceil((y_hi - y_lo) / POISSON_COVER_STEP_PX)))
+    step_x = (x_hi - x_lo) / nx
+    step_y = (y_hi - y_lo) / ny
+    reach = min_dist_px - 0.5 * math.hypot(step_x, step_y) - 1e-6
+    return nx, ny, step_x, step_y, reach
+
+
+def _coverage_mask(
+    table: np.ndarray,
+    *,
+    x_lo: float,
+    x_hi: float,
+    y_lo: float,
+    y_hi: float,
+    cell_size: float,
+    grid_w: int,
+    grid_h: int,
+    min_dist_px: float,
+) -> np.ndarray:
+    """
+    (ny, nx) bool mask of band cells in which no candidate can ever be accepted.
+
+    The band [x_lo, x_hi) x [y_lo, y_hi) is split into ~`POISSON_COVER_STEP_PX` cells (see
+    `_cover_geometry`). The mask is conservative (it may leave a covered cell unmarked, never the
+    reverse) and stays valid as more points are added; `_mark_covered` extends it.
+    """
+
+    nx, ny, step_x, step_y, reach = _cover_geometry(
+        x_lo=x_lo, x_hi=x_hi, y_lo=y_lo, y_hi=y_hi, min_dist_px=min_dist_px
+    )
+    if reach <= 0.0:
+        return np.zeros((ny, nx), dtype=bool)
+    centers_x, centers_y = np.meshgrid(
+        x_lo + (np.arange(nx) + 0.5) * step_x, y_lo + (np.arange(ny) + 0.5) * step_y
+    )
+    covered = _blocked_by_table(
+        centers_x.ravel(),
+        centers_y.ravel(),
+        table,
+        cell_size=cell_size,
+        grid_w=grid_w,
+        grid_h=grid_h,
+        min_dist_sq=reach * reach,
+    )
+    return covered.reshape(ny, nx)
+
+
+def _mark_covered(
+    covered: np.ndarray,
+    points: np.ndarray,
+    *,
+    x_lo: float,
+    x_hi: float,
+    y_lo: float,
+    y_hi: float,
+    min_dist_px: float,
+) -> None:
+    """Add the cells covered by a few newly accepted `points` to a `_coverage_mask` in place."""
+
+    nx, ny, step_x, step_y, reach = _cover_geometry(
+        x_lo=x_lo, x_hi=x_hi, y_lo=y_lo, y_hi=y_hi, min_dist_px=min_dist_px
+    )
+    if reach <= 0.0:
+        return
+    for px, py in points.tolist():
+        ix0 = max(0, int(math.floor((px - reach - x_lo) / step_x)))
+        ix1 = min(nx, int(math.ceil((px + reach - x_lo) / step_x)) + 1)
+        iy0 = max(0, int(math.floor((py - reach - y_lo) / step_y)))
+        iy1 = min(ny, int(math.ceil((py + reach - y_lo) / step_y)) + 1)
+        if ix0 >= ix1 or iy0 >= iy1:
+            continue
+        dx = x_lo + (np.arange(ix0, ix1) + 0.5) * step_x - px
+        dy = y_lo + (np.arange(iy0, iy1) + 0.5) * step_y - py
+        covered[iy0:iy1, ix0:ix1] |= (dy[:, None] * dy[:, None] + dx * dx) < reach * reach
+
+
 def _poisson_sample(
     *,
     rng: random.Random,
@@ -123,79 +449,207 @@ def _poisson_sample(
     height: int,
     min_dist_px: float,
     max_attempts: int,
-    existing_points: list[tuple[float, float]] | None = None,
+    existing_points: np.ndarray | None = None,
     x_min: float | None = None,
     x_max: float | None = None,
     y_min: float | None = None,
     y_max: float | None = None,
-) -> list[tuple[float, float]]:
+) -> np.ndarray:
     """
     Sample points with a minimum separation using a grid-accelerated rejection loop.
 
     This avoids clustered points which read as "snow" in low-height strips.
+
+    Candidates are tested in blocks: one vectorized pass rejects everything that collides with the
+    points known at the start of the block (a flat NumPy cell table), and only the survivors go
+    through the sequential accept loop. Accept/reject decisions match a one-at-a-time loop exactly.
+
+    Once a block accepts nothing, a `_coverage_mask` of provably full cells is built (and extended
+    as points land); later candidates in those cells are rejected by a lookup. If the whole band is full, the
+    remaining attempts are skipped (the RNG is still advanced past them, so later draws are
+    unchanged).
     """
 
     if count <= 0:
-        return []
+        return np.empty((0, 2))
 
     x_lo = 0.0 if x_min is None else max(0.0, x_min)
     x_hi = float(width - 1) if x_max is None else min(float(width - 1), x_max)
     y_lo = 0.0 if y_min is None else max(0.0, y_min)
     y_hi = float(height - 1) if y_max is None else min(float(height - 1), y_max)
     if x_hi <= x_lo or y_hi <= y_lo:
-        return []
+        return np.empty((0, 2))
 
     cell_size = min_dist_px / math.sqrt(2.0)
     grid_w = int(math.ceil(width / cell_size))
     grid_h = int(math.ceil(height / cell_size))
-    grid: list[list[int]] = [[] for _ in range(grid_w * grid_h)]
-    points: list[tuple[float, float]] = []
     min_dist_sq = min_dist_px * min_dist_px
 
-    def grid_index(x: float, y: float) -> tuple[int, int]:
-        return int(x / cell_size), int(y / cell_size)
-
-    def fits(x: float, y: float) -> bool:
-        gx, gy = grid_index(x, y)
-        for yy in range(max(0, gy - 2), min(grid_h, gy + 3)):
-            row = yy * grid_w
-            for xx in range(max(0, gx - 2), min(grid_w, gx + 3)):
-                for idx in grid[row + xx]:
-                    px, py = points[idx]
-                    dx = x - px
-                    dy = y - py
-                    if dx * dx + dy * dy < min_dist_sq:
-                        return False
-        return True
-
-    if existing_points:
-        for x, y in existing_points:
-            # Clamp to the valid bounds; defensive against rounding drift in callers.
-            x = max(0.0, min(float(width - 1), x))
-            y = max(0.0, min(float(height - 1), y))
-            points.append((x, y))
-            gx, gy = grid_index(x, y)
-            grid[gy * grid_w + gx].append(len(points) - 1)
-
-    target_total = count + (len(existing_points) if existing_points else 0)
-
-    for _ in range(max_attempts):
-        if len(points) >= target_total:
-            break
-        x = rng.uniform(x_lo, x_hi)
-        y = rng.uniform(y_lo, y_hi)
-        if not fits(x, y):
-            continue
-        points.append((x, y))
-        gx, gy = grid_index(x, y)
-        grid[gy * grid_w + gx].append(len(points) - 1)
+    capacity = POISSON_JAMMING_DENSITY * (x_hi - x_lo) * (y_hi - y_lo) / (math.pi * min_dist_sq / 4.0)
+    if count > capacity:
+        print(
+            f"warning: {count} points at {min_dist_px:g}px spacing exceed the ~{int(capacity)} that fit "
+            f"in x=[{x_lo:g}, {x_hi:g}], y=[{y_lo:g}, {y_hi:g}]",
+            file=sys.stderr,
+        )
+
+    # Seeds and accepted points share one pre-sized (capacity, 2) array; `n` counts used rows.
+    seeds = np.asarray(existing_points if existing_points is not None else (), dtype=np.float64)
+    seeds = seeds.reshape(-1, 2)
+    n_seed = len(seeds)
+    target_total = count + n_seed
+    points = np.empty((target_total, 2), np.float64)
+    # Clamp to the valid bounds; defensive against rounding drift in callers.
+    np.clip(seeds[:, 0], 0.0, float(width - 1), out=points[:n_seed, 0])
+    np.clip(seeds[:, 1], 0.0, float(height - 1), out=points[:n_seed, 1])
+    n = n_seed
+
+    # Candidates are drawn in blocks from a NumPy mirror of `rng` (same values as per-attempt
+    # `rng.uniform` calls); afterwards `rng` is advanced by exactly the attempts that were used.
+    bit_gen = _mt19937_mirror(rng)
+    attempts = 0
+    table = np.empty((0, 0, 2))
+    table_n = -1
+    covered: np.ndarray | None = None
+    covered_n = -1
+    while attempts < max_attempts and n < target_total:
+        batch_state = bit_gen.state
+        batch = min(POISSON_CANDIDATE_BATCH, max_attempts - attempts)
+        uniforms = _mt19937_doubles(bit_gen, 2 * batch)
+        cand_x = x_lo + (x_hi - x_lo) * uniforms[0::2]
+        cand_y = y_lo + (y_hi - y_lo) * uniforms[1::2]
+        if table_n != n:
+            # Saturated bands accept nothing for many blocks; the table only changes on accepts.
+            table = _cell_table(points[:n], cell_size=cell_size, grid_w=grid_w, grid_h=grid_h)
+            table_n = n
+        if covered is None:
+            blocked = _blocked_by_table(
+                cand_x,
+                cand_y,
+                table,
+                cell_size=cell_size,
+                grid_w=grid_w,
+                grid_h=grid_h,
+                min_dist_sq=min_dist_sq,
+            )
+        else:
+            # Candidates in certified cells are blocked outright; only the rest need distances.
+            cover_x = ((cand_x - x_lo) * (covered.shape[1] / (x_hi - x_lo))).astype(np.intp)
+            cover_y = ((cand_y - y_lo) * (covered.shape[0] / (y_hi - y_lo))).astype(np.intp)
+            blocked = covered[
+                np.minimum(cover_y, covered.shape[0] - 1), np.minimum(cover_x, covered.shape[1] - 1)
+            ]
+            open_idx = np.flatnonzero(~blocked)
+            blocked[open_idx] = _blocked_by_table(
+                cand_x[open_idx],
+                cand_y[open_idx],
+                table,
+                cell_size=cell_size,
+                grid_w=grid_w,
+                grid_h=grid_h,
+                min_dist_sq=min_dist_sq,
+            )
+        if blocked.all():
+            if covered is None:
+                # First saturated block: certify which cells are already full.
+                covered = _coverage_mask(
+                    table,
+                    x_lo=x_lo,
+                    x_hi=x_hi,
+                    y_lo=y_lo,
+                    y_hi=y_hi,
+                    cell_size=cell_size,
+                    grid_w=grid_w,
+                    grid_h=grid_h,
+                    min_dist_px=min_dist_px,
+                )
+                covered_n = n
+            if covered.all():
+                bit_gen.random_raw(4 * (max_attempts - attempts - batch), output=False)
+                attempts = max_attempts
+                break
+        xs = cand_x.tolist()
+        ys = cand_y.tolist()
+        used = batch
+        # Survivors only need checking against points accepted earlier in this block.
+        block_cells: dict[tuple[int, int], list[tuple[float, float]]] = {}
+        for i in np.flatnonzero(~blocked).tolist():
+            x = xs[i]
+            y = ys[i]
+            gx = int(x / cell_size)
+            gy = int(y / cell_size)
+            if block_cells and any(
+                (x - px) * (x - px) + (y - py) * (y - py) < min_dist_sq
+                for yy in range(gy - 2, gy + 3)
+                for xx in range(gx - 2, gx + 3)
+                for px, py in block_cells.get((xx, yy), ())
+            ):
+                continue
+            points[n] = (x, y)
+            n += 1
+            block_cells.setdefault((gx, gy), []).append((x, y))
+            if n >= target_total:
+                used = i + 1
+                break
+        if covered is not None and covered_n != n:
+            # Coverage only grows with accepts, so the mask is extended rather than rebuilt.
+            _mark_covered(
+                covered,
+                points[covered_n:n],
+                x_lo=x_lo,
+                x_hi=x_hi,
+                y_lo=y_lo,
+                y_hi=y_hi,
+                min_dist_px=min_dist_px,
+            )
+            covered_n = n
+        if used < batch:
+            # Rewind to the block start and replay only the consumed attempts (4 words each).
+            bit_gen.state = batch_state
+            bit_gen.random_raw(4 * used, output=False)
+        attempts += used
+    _mt19937_sync(rng, bit_gen)
 
     # If sampling cannot reach target density, return best effort rather than forcing clumps.
-    if not existing_points:
-        return points
+    # Pre-seeded points are not returned; callers only need newly sampled points, as an (n, 2)
+    # float64 array.
+    return points[n_seed:n].copy()
 
-    # Strip the pre-seeded points before returning; callers only need newly sampled points.
-    return points[len(existing_points) :]
+
+def _poisson_sample_sides(
+    *,
+    rng: random.Random,
+    count_per_side: int,
+    width: int,
+    height: int,
+    min_dist_px: float,
+    max_attempts_per_side: int,
+    existing_points: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Sample the left (x <= 35% of the width) and right (x >= 65%) bands from one `rng` stream.
+
+    The left band consumes the stream first and the right band continues where it stopped, so
+    results match two back-to-back `_poisson_sample` calls. The bands are far further apart than
+    any spacing used here, so left points never need to be seeded into the right band.
+    """
+
+    bands = ((0.0, width * 0.35), (width * 0.65, float(width - 1)))
+    left, right = [
+        _poisson_sample(
+            rng=rng,
+            count=count_per_side,
+            width=width,
+            height=height,
+            min_dist_px=min_dist_px,
+            max_attempts=max_attempts_per_side,
+            existing_points=existing_points,
+            x_min=x_min,
+            x_max=x_max,
+        )
+        for x_min, x_max in bands
+    ]
+    return left, right
 
 
 def _draw_starfield(
@@ -207,16 +661,16 @@ def _draw_starfield(
     width: int,
     height: int,
     min_dist_px: float,
-    points: list[tuple[float, float]] | None = None,
+    points: np.ndarray | None = None,
+    onto: Image.Image | None = None,
 ) -> Image.Image:
     """
     Draw a star layer with soft glow on a transparent canvas.
-    """
 
-    canvas = Image.new("RGBA", (width, height), (0, 0, 0, 0))
-    glow = Image.new("RGBA", (width, height), (0, 0, 0, 0))
-    draw_canvas = ImageDraw.Draw(canvas)
-    draw_glow = ImageDraw.Draw(glow)
+    With `onto`, the layer is composited over that image in place and `onto` is returned. Only
+    the box the stars can touch is rendered, blurred and composited, which is exact because
+    everything outside it is fully transparent.
+    """
 
     if points is None:
         points = _poisson_sample(
@@ -228,67 +682,158 @@ def _draw_starfield(
             max_attempts=count * 2500,
         )
 
-    for x_f, y_f in points:
-        x01 = x_f / max(1.0, (width - 1.0))
-        x = int(round(x_f))
-        y = int(round(y_f))
-
-        fade = _edge_fade_alpha(x01)
-        alpha = int(base_alpha * rng.uniform(0.55, 1.0) * fade)
+    # The scalar `rng` calls define the committed starfield and cannot be replayed in bulk
+    # (randint/choice use rejection sampling). The loop therefore only draws; everything derived
+    # from the draws is computed on whole arrays afterwards.
+    uniform, randint, roll, choice = rng.uniform, rng.randint, rng.random, rng.choice
+    kept: list[int] = []
+    alphas: list[int] = []
+    jitter: list[tuple[int, int, int]] = []
+    core_radii: list[int] = []
+    glow_radii: list[int] = []
+    points_xy = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    fades = _edge_fade_alpha(points_xy[:, 0] / max(1.0, (width - 1.0)))
+    for index, fade in enumerate(fades.tolist()):
+        alpha = int(base_alpha * uniform(0.55, 1.0) * fade)
         if alpha <= 0:
             continue
 
         # Mild cool tint variation keeps stars from reading as uniform noise.
-        r = min(255, tint_rgb[0] + rng.randint(-10, 10))
-        g = min(255, tint_rgb[1] + rng.randint(-10, 10))
-        b = min(255, tint_rgb[2] + rng.randint(-5, 5))
+        jitter.append((randint(-10, 10), randint(-10, 10), randint(-5, 5)))
 
-        size_roll = rng.random()
+        size_roll = roll()
         if size_roll < 0.95:
-            core_r = 0
-            glow_r = rng.choice([1, 1, 1, 2])
+            core_radii.append(0)
+            glow_radii.append(choice([1, 1, 1, 2]))
         elif size_roll < 0.995:
-            core_r = 1
-            glow_r = rng.choice([2, 2, 2, 3])
+            core_radii.append(1)
+            glow_radii.append(choice([2, 2, 2, 3]))
         else:
-            core_r = 1
-            glow_r = 3
+            core_radii.append(1)
+            glow_radii.append(3)
+        kept.append(index)
+        alphas.append(alpha)
+
+    xy = np.rint(points_xy[kept]).astype(np.int64)
+    rgb = np.minimum(255, np.asarray(tint_rgb, dtype=np.int64) + np.asarray(jitter, dtype=np.int64))
+    alpha_arr = np.asarray(alphas, dtype=np.int64)
+    core_r = np.asarray(core_radii, dtype=np.int64)
+    glow_alpha = np.minimum(14, (alpha_arr * 0.60).astype(np.int64))
+    core_alpha = np.minimum(255, (alpha_arr * np.where(core_r == 0, 2.1, 1.5)).astype(np.int64))
+
+    # Op tables: (x, y, radius, r, g, b, a); core radius 0 paints a single pixel.
+    glow_ops = np.column_stack((xy, glow_radii, rgb, glow_alpha)).reshape(-1, 7)
+    canvas_ops = np.column_stack((xy, core_r, rgb, core_alpha)).reshape(-1, 7)
+
+    layer = onto if onto is not None else Image.new("RGBA", (width, height), (0, 0, 0, 0))
+    if len(xy) == 0:
+        return layer
+
+    reach = np.maximum(glow_ops[:, 2], canvas_ops[:, 2]) + STARFIELD_BLUR_MARGIN_PX
+    x0 = max(0, int((xy[:, 0] - reach).min()))
+    y0 = max(0, int((xy[:, 1] - reach).min()))
+    x1 = min(width, int((xy[:, 0] + reach).max()) + 1)
+    y1 = min(height, int((xy[:, 1] + reach).max()) + 1)
+    glow_ops[:, :2] -= (x0, y0)
+    canvas_ops[:, :2] -= (x0, y0)
+
+    canvas = np.zeros((y1 - y0, x1 - x0, 4), np.uint8)
+    glow = np.zeros((y1 - y0, x1 - x0, 4), np.uint8)
+    _paint_disks(glow, glow_ops)
+    _paint_disks(canvas, canvas_ops)
 
-        glow_alpha = min(14, int(alpha * 0.60))
-        core_alpha = min(255, int(alpha * (2.1 if core_r == 0 else 1.5)))
+    # A small blur produces a soft star bloom while minimizing background haze.
+    glow_image = Image.fromarray(glow).filter(ImageFilter.GaussianBlur(radius=0.75))
+    merged = Image.alpha_composite(glow_image, Image.fromarray(canvas))
+    if onto is None:
+        # Compositing over transparent pixels is not an exact copy; a fresh layer is pasted.
+        layer.paste(merged, (x0, y0))
+    else:
+        layer.alpha_composite(merged, dest=(x0, y0))
+    return layer
+
+
+# zlib level for default (non-release) runs: level 1 encodes several times faster than
+# `optimize=True` for a modestly larger file.
+PNG_DEV_COMPRESS_LEVEL = 1
+# Overrides PNG_DEV_COMPRESS_LEVEL (0-9) without editing the script.
+PNG_COMPRESS_ENV = "STARLIGHT_PNG_COMPRESS"
+# Rows handed to zlib per step by the streaming PNG writer (bounds the scanline copy).
+PNG_STREAM_ROWS = 256
+# Output file buffer: multi-MB sheets reach the OS in large writes rather than 8 KiB pieces.
+PNG_WRITE_BUFFER = 1 << 20
+
+
+def _scanline_buffer(*lead: int, height: int, width: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Zeroed PNG scanline storage plus an RGBA pixel view of the same memory.
 
-        draw_glow.ellipse(
-            (x - glow_r, y - glow_r, x + glow_r, y + glow_r),
-            fill=(r, g, b, glow_alpha),
-        )
+    Each row is a filter-type byte (0: none) followed by `width` RGBA pixels, so images drawn into
+    the pixel view can be handed to zlib as-is. Returns `(rows, pixels)` shaped
+    (*lead, height, 1 + width * 4) and (*lead, height, width, 4).
+    """
 
-        if core_r == 0:
-            draw_canvas.point((x, y), fill=(r, g, b, core_alpha))
-        else:
-            draw_canvas.ellipse(
-                (x - core_r, y - core_r, x + core_r, y + core_r),
-                fill=(r, g, b, core_alpha),
-            )
+    rows = np.zeros((*lead, height, 1 + width * 4), np.uint8)
+    return rows, rows[..., 1:].reshape(*lead, height, width, 4)
 
-    # A small blur produces a soft star bloom while minimizing background haze.
-    glow = glow.filter(ImageFilter.GaussianBlur(radius=0.75))
-    merged = Image.alpha_composite(glow, canvas)
-    return merged
 
+def _write_png(
+    path: Path, rows: np.ndarray, *, release: bool = False, level: int = PNG_DEV_COMPRESS_LEVEL
+) -> None:
+    """
+    Write (H, 1 + W * 4) uint8 scanlines from `_scanline_buffer` as an RGBA PNG.
+    """
 
-def _write_png(path: Path, image: Image.Image) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
-    image.save(path, format="PNG", optimize=True)
+    if release:
+        # Smallest files for committing; the multi-pass optimizer dominates total runtime.
+        pixels = np.ascontiguousarray(rows[:, 1:]).reshape(len(rows), -1, 4)
+        with path.open("wb", buffering=PNG_WRITE_BUFFER) as handle:
+            Image.fromarray(pixels).save(handle, format="PNG", optimize=True)
+    else:
+        # Same pixels at a fraction of the encode time while iterating on tuning constants.
+        _stream_png(path, rows, level=level)
+
+
+def _write_png_chunk(handle: BinaryIO, tag: bytes, data: bytes) -> None:
+    # Length, tag, data, CRC written piecewise so large IDAT payloads are never copied.
+    handle.write(struct.pack(">I", len(data)) + tag)
+    handle.write(data)
+    handle.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(tag))))
+
+
+def _stream_png(path: Path, rows: np.ndarray, *, level: int) -> None:
+    """
+    Encode RGBA scanlines straight from NumPy, compressing PNG_STREAM_ROWS rows at a time.
+
+    Rows use filter type 0 (none): the mostly-transparent star layers compress better unfiltered
+    than with Pillow's adaptive filters, and the scanline buffer is compressed without copies.
+    """
+
+    height = len(rows)
+    width = (rows.shape[1] - 1) // 4
+    compressor = zlib.compressobj(level)
+    with path.open("wb", buffering=PNG_WRITE_BUFFER) as handle:
+        handle.write(b"\x89PNG\r\n\x1a\n")
+        # 8-bit RGBA (color type 6), deflate, adaptive filtering method 0, no interlace.
+        _write_png_chunk(handle, b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0))
+        for start in range(0, height, PNG_STREAM_ROWS):
+            data = compressor.compress(rows[start : start + PNG_STREAM_ROWS])
+            if data:
+                _write_png_chunk(handle, b"IDAT", data)
+        _write_png_chunk(handle, b"IDAT", compressor.flush())
+        _write_png_chunk(handle, b"IEND", b"")
 
 
 def _render_twinkle_frames(
     *,
     seed: int,
-    points: list[tuple[float, float]],
-    kinds: dict[tuple[int, int], str] | None = None,
-) -> list[Image.Image]:
+    points: np.ndarray,
+    roles: np.ndarray | None = None,
+    out: np.ndarray | None = None,
+) -> np.ndarray:
     """
-    Render twinkle frames (single-frame images).
+    Render twinkle frames into one (FRAME_COUNT, H, W, 4) uint8 RGBA buffer (`out` if given).
 
     Each star has a stable position and a per-frame intensity curve, which produces a BMW-like
     "fade up / fade down" twinkle rather than a hard on/off flicker.
@@ -298,17 +843,14 @@ def _render_twinkle_frames(
 
     # Twinkle star specifications (stable positions; per-frame intensity is computed below).
     #
-    # This uses plain tuples to keep the generator dependency-free.
+    # Collected as tuples while the RNG streams are consumed, then packed into `TwinkleStars`.
     #
-    # tuple: (x01, y01, events, peak_alpha, glow_radius_px, power, kind)
+    # tuple: (x01, y01, events, peak_alpha, glow_radius_px, power, style)
     # - events: list of (center_t, half_width_t) in normalized time [0, 1]
-    # - kind:
-    #   - "normal": standard core + glow
-    #   - "sparkle": standard core + glow + subtle flare
-    #   - "macro": larger/brighter hero stars (still fading in/out)
-    stars: list[tuple[float, float, list[tuple[float, float]], int, int, float, str]] = []
+    # - style: STYLE_* code
+    stars: list[tuple[float, float, list[tuple[float, float]], int, int, float, int]] = []
 
-    def add_random_twinkles(*, pts: list[tuple[float, float]], kind: str, style: str) -> None:
+    def add_random_twinkles(*, pts: list[tuple[float, float]], kind: str, style: int) -> None:
         """
         Add twinkle stars with randomized envelopes.
 
@@ -375,7 +917,7 @@ def _render_twinkle_frames(
             peak_alpha = local_rng.randint(180, 240)
             glow_r = local_rng.choice([1, 1, 2])
             power = local_rng.uniform(1.1, 1.8)
-            stars.append((x01, y01, [(center_t, half_width_t)], peak_alpha, glow_r, power, "normal"))
+            stars.append((x01, y01, [(center_t, half_width_t)], peak_alpha, glow_r, power, STYLE_NORMAL))
 
     def add_macro_twinkles(*, pts: list[tuple[float, float]], phase_seed: int) -> None:
         """
@@ -399,15 +941,14 @@ def _render_twinkle_frames(
             peak_alpha = local_rng.randint(220, 255)
             glow_r = 3
             power = local_rng.uniform(1.05, 1.55)
-            stars.append((x01, y01, [(center_t, half_width_t)], peak_alpha, glow_r, power, "macro"))
+            stars.append((x01, y01, [(center_t, half_width_t)], peak_alpha, glow_r, power, STYLE_MACRO))
 
     # Partition points into roles.
     # - Points are pre-sampled with minimum separation to avoid clustered "snow".
     # - Certain points are explicitly sampled for anchors/macros/sparkles in `main()`; those are
-    #   provided via `kinds` to keep scheduling stable and prevent accidental duplication.
-    # - Keys are rounded integer coordinates so the mapping is stable across floating-point
-    #   representation and independent of list ordering.
-    kinds = kinds or {}
+    #   provided via `roles` to keep scheduling stable and prevent accidental duplication.
+    # - Roles are looked up by rounded integer coordinates so the mapping is stable across
+    #   floating-point representation and independent of list ordering.
 
     anchor_left: list[tuple[float, float]] = []
     anchor_right: list[tuple[float, float]] = []
@@ -416,22 +957,29 @@ def _render_twinkle_frames(
     sparkle_points: list[tuple[float, float]] = []
     other_points: list[tuple[float, float]] = []
 
-    pts = points[:]
-    rng.shuffle(pts)
+    # `shuffle` only depends on the length, so shuffling indices gives the same permutation (and
+    # RNG consumption) as shuffling the points themselves.
+    order = list(range(len(points)))
+    rng.shuffle(order)
+    shuffled = np.asarray(points, dtype=np.float64).reshape(-1, 2)[order]
 
-    for x_f, y_f in pts:
-        key = (int(round(x_f)), int(round(y_f)))
-        kind = kinds.get(key)
+    if roles is None or not len(shuffled):
+        pt_roles = [ROLE_OTHER] * len(shuffled)
+    else:
+        xy = np.rint(shuffled).astype(np.intp)
+        pt_roles = roles[xy[:, 1], xy[:, 0]].tolist()
+
+    for (x_f, y_f), role in zip(shuffled.tolist(), pt_roles):
         x01 = x_f / max(1.0, (FRAME_WIDTH - 1.0))
 
-        if kind == "sparkle":
+        if role == ROLE_SPARKLE:
             sparkle_points.append((x_f, y_f))
-        elif kind == "macro":
+        elif role == ROLE_MACRO:
             if x01 <= 0.5:
                 macro_left.append((x_f, y_f))
             else:
                 macro_right.append((x_f, y_f))
-        elif kind == "anchor":
+        elif role == ROLE_ANCHOR:
             if x01 <= 0.5:
                 anchor_left.append((x_f, y_f))
             else:
@@ -448,134 +996,319 @@ def _render_twinkle_frames(
     add_macro_twinkles(pts=macro_right, phase_seed=seed + 404)
     add_anchor_twinkles(pts=anchor_left, phase_seed=seed + 101)
     add_anchor_twinkles(pts=anchor_right, phase_seed=seed + 202)
-    add_random_twinkles(pts=main_points, kind="main", style="normal")
-    add_random_twinkles(pts=micro_points, kind="micro", style="normal")
-    add_random_twinkles(pts=sparkle_points, kind="micro", style="sparkle")
+    add_random_twinkles(pts=main_points, kind="main", style=STYLE_NORMAL)
+    add_random_twinkles(pts=micro_points, kind="micro", style=STYLE_NORMAL)
+    add_random_twinkles(pts=sparkle_points, kind="micro", style=STYLE_SPARKLE)
 
-    frames: list[Image.Image] = []
+    packed = _pack_twinkle_stars(stars)
+    alpha_table = _twinkle_alpha_table(packed)
 
+    # Frames only share read-only star data, so they render in worker processes and land in one
+    # contiguous buffer (the sprite sheet is then a reshape of it).
     # Frame count uses the last frame as a duplicate of the first for a seamless wrap.
-    for frame_index in range(FRAME_COUNT):
-        t = (frame_index % (FRAME_COUNT - 1)) / float(FRAME_COUNT - 1)
-
-        frame = Image.new("RGBA", (FRAME_WIDTH, FRAME_HEIGHT), (0, 0, 0, 0))
-        glow = Image.new("RGBA", (FRAME_WIDTH, FRAME_HEIGHT), (0, 0, 0, 0))
-        shadow = Image.new("RGBA", (FRAME_WIDTH, FRAME_HEIGHT), (0, 0, 0, 0))
-        draw_frame = ImageDraw.Draw(frame)
-        draw_glow = ImageDraw.Draw(glow)
-        draw_shadow = ImageDraw.Draw(shadow)
-
-        for x01, y01, events, peak_alpha, glow_r, power, style in stars:
-            # Raised-cosine envelope per event:
-            # - 1.0 at the event center
-            # - smoothly fades to 0.0 at the event edges
-            best = 0.0
-            for center_t, half_width_t in events:
-                dt = abs(t - center_t)
-                dt = min(dt, 1.0 - dt)  # wrap-around distance for looping
-                if dt >= half_width_t:
-                    continue
-                x = dt / max(1e-6, half_width_t)
-                v = 0.5 * (1.0 + math.cos(math.pi * x))
-                if v > best:
-                    best = v
-
-            if best <= 0.0:
-                continue
+    frames = out
+    if frames is None:
+        frames = np.empty((len(alpha_table), FRAME_HEIGHT, FRAME_WIDTH, 4), np.uint8)
+    with ProcessPoolExecutor() as pool:
+        render = functools.partial(_render_twinkle_frame, stars=packed)
+        for index, frame in enumerate(pool.map(render, alpha_table, chunksize=8)):
+            frames[index] = frame
+    return frames
 
-            intensity = best**power
 
-            fade = _edge_fade_alpha(x01)
-            alpha = int(peak_alpha * intensity * fade)
-            if alpha <= 0:
-                continue
+@functools.cache
+def _flare_tables() -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    `TWINKLE_FLARES` as (style, flare) arrays: dx, dy, alpha scale and alpha cap.
 
-            x = int(x01 * (FRAME_WIDTH - 1))
-            y = int(y01 * (FRAME_HEIGHT - 1))
-
-            # Improve visibility on light wallpapers without adding a visible bar backdrop by
-            # baking a subtle dark shadow underneath twinkles. This remains per-star (not a band),
-            # so the `window#waybar` background can stay fully transparent.
-            shadow_r = min(6, (glow_r + 2) if style in {"macro", "sparkle"} else (glow_r + 1))
-            shadow_a = min(85 if style == "macro" else 65, int(alpha * (0.28 if style == "macro" else 0.22)))
-            if shadow_a > 0:
-                draw_shadow.ellipse(
-                    (x - shadow_r, y - shadow_r, x + shadow_r, y + shadow_r),
-                    fill=(0, 0, 0, shadow_a),
-                )
+    Styles with fewer flares are padded with zero-cap entries, which never paint.
+    """
 
-            # Core and glow; glow uses a smaller alpha cap to avoid a visible tinted band.
-            glow_r = min(glow_r, 3)
-            draw_glow.ellipse(
-                (x - glow_r, y - glow_r, x + glow_r, y + glow_r),
-                fill=(
-                    255,
-                    255,
-                    255,
-                    min(
-                        185 if style == "macro" else 150,
-                        int(alpha * (0.90 if style == "macro" else (0.85 if glow_r >= 3 else 0.95))),
-                    ),
-                ),
-            )
-            if style == "macro":
-                # Secondary faint halo increases perceived size without increasing the number of
-                # macro stars or adding sliding motion.
-                halo_r = 5
-                halo_a = min(70, int(alpha * 0.22))
-                if halo_a > 0:
-                    draw_glow.ellipse(
-                        (x - halo_r, y - halo_r, x + halo_r, y + halo_r),
-                        fill=(255, 255, 255, halo_a),
-                    )
-            # Core uses a single pixel to avoid a "blob" look when scaled.
-            draw_frame.point((x, y), fill=(255, 255, 255, min(255, int(alpha * 1.25))))
-
-            if style == "macro":
-                # Subtle multi-point flare makes macro stars read as "hero" points.
-                # Intensity is capped to avoid creating a distracting sparkle pattern.
-                flare_a = min(110, int(alpha * 0.45))
-                diag_a = min(70, int(alpha * 0.28))
-                if flare_a > 0:
-                    draw_frame.point((x - 3, y), fill=(255, 255, 255, flare_a))
-                    draw_frame.point((x + 3, y), fill=(255, 255, 255, flare_a))
-                    draw_frame.point((x, y - 3), fill=(255, 255, 255, flare_a))
-                    draw_frame.point((x, y + 3), fill=(255, 255, 255, flare_a))
-                if diag_a > 0:
-                    draw_frame.point((x - 2, y - 2), fill=(255, 255, 255, diag_a))
-                    draw_frame.point((x + 2, y - 2), fill=(255, 255, 255, diag_a))
-                    draw_frame.point((x - 2, y + 2), fill=(255, 255, 255, diag_a))
-                    draw_frame.point((x + 2, y + 2), fill=(255, 255, 255, diag_a))
-            elif style == "sparkle":
-                # Subtle 4-point flare; intensity is intentionally capped so the effect reads as
-                # a premium glint rather than a distracting "spark".
-                flare_a = min(70, int(alpha * 0.35))
-                if flare_a > 0:
-                    draw_frame.point((x - 2, y), fill=(255, 255, 255, flare_a))
-                    draw_frame.point((x + 2, y), fill=(255, 255, 255, flare_a))
-                    draw_frame.point((x, y - 2), fill=(255, 255, 255, flare_a))
-                    draw_frame.point((x, y + 2), fill=(255, 255, 255, flare_a))
-
-        shadow = shadow.filter(ImageFilter.GaussianBlur(radius=1.05))
-        glow = glow.filter(ImageFilter.GaussianBlur(radius=0.75))
-        frames.append(Image.alpha_composite(Image.alpha_composite(shadow, glow), frame))
+    width = max(len(flares) for flares in TWINKLE_FLARES.values())
+    table = np.zeros((len(TWINKLE_FLARES), width, 4))
+    for style, flares in TWINKLE_FLARES.items():
+        if flares:
+            table[style, : len(flares)] = flares
+    offsets = table[:, :, :2].astype(np.int64)
+    return offsets[:, :, 0], offsets[:, :, 1], table[:, :, 2], table[:, :, 3].astype(np.int64)
 
-    return frames
 
+@functools.cache
+def _twinkle_buffers() -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Scratch layers reused by every `_render_twinkle_frame` call in this process.
+
+    Returns (core LA, glow LA, shadow L) uint8 buffers; callers clear them before painting.
+    """
+
+    return (
+        np.zeros((FRAME_HEIGHT, FRAME_WIDTH, 2), np.uint8),
+        np.zeros((FRAME_HEIGHT, FRAME_WIDTH, 2), np.uint8),
+        np.zeros((FRAME_HEIGHT, FRAME_WIDTH), np.uint8),
+    )
+
+
+def _render_twinkle_frame(
+    alpha_row: np.ndarray,
+    *,
+    stars: TwinkleStars,
+) -> np.ndarray:
+    """
+    Render one twinkle frame as an (H, W, 4) uint8 array.
+
+    alpha_row: per-star alpha for this frame (one row of `_twinkle_alpha_table`).
+    """
+
+    # Every twinkle layer is a single color (white core/glow, black shadow), so layers are kept
+    # as luminance + alpha: (x, y, radius, l, a) for core/glow, (x, y, radius, a) for shadow.
+    # Op tables are built for all active stars at once; a star's ops sit in consecutive rows so
+    # overlapping stars are painted in the same order as a per-star loop.
+    active = alpha_row > 0
+    x = stars.x[active]
+    y = stars.y[active]
+    glow_r = stars.glow_r[active]
+    style = stars.style[active]
+    alpha = alpha_row[active]
+    is_macro = style == STYLE_MACRO
+    n = len(alpha)
+    white = np.full(n, 255, np.int64)
+    always = np.ones((n, 1), bool)
+
+    # Improve visibility on light wallpapers without adding a visible bar backdrop by
+    # baking a subtle dark shadow underneath twinkles. This remains per-star (not a band),
+    # so the `window#waybar` background can stay fully transparent.
+    shadow_r = np.minimum(6, glow_r + np.where(style != STYLE_NORMAL, 2, 1))
+    shadow_scale = np.where(is_macro, 0.28, 0.22)
+    shadow_a = np.minimum(np.where(is_macro, 85, 65), (alpha * shadow_scale).astype(np.int64))
+    shadow_ops = np.column_stack((x, y, shadow_r, shadow_a))[shadow_a > 0]
+
+    # Core and glow; glow uses a smaller alpha cap to avoid a visible tinted band.
+    glow_r = np.minimum(glow_r, 3)
+    glow_scale = np.where(is_macro, 0.90, np.where(glow_r >= 3, 0.85, 0.95))
+    glow_a = np.minimum(np.where(is_macro, 185, 150), (alpha * glow_scale).astype(np.int64))
+    # Secondary faint halo (macro only) increases perceived size without increasing the number
+    # of macro stars or adding sliding motion.
+    halo_a = np.where(is_macro, np.minimum(70, (alpha * 0.22).astype(np.int64)), 0)
+    glow_ops = np.stack(
+        (
+            np.column_stack((x, y, glow_r, white, glow_a)),
+            np.column_stack((x, y, np.full(n, 5), white, halo_a)),
+        ),
+        axis=1,
+    )[np.hstack((always, (halo_a > 0)[:, None]))]
+
+    # Core uses a single pixel to avoid a "blob" look when scaled; flares follow the core.
+    flare_dx, flare_dy, flare_scale, flare_cap = (table[style] for table in _flare_tables())
+    flare_a = np.minimum(flare_cap, (alpha[:, None] * flare_scale).astype(np.int64))
+    frame_ops = np.zeros((n, 1 + flare_a.shape[1], 5), np.int64)
+    frame_ops[:, :, 3] = 255
+    frame_ops[:, 0, 0] = x
+    frame_ops[:, 0, 1] = y
+    frame_ops[:, 0, 4] = np.minimum(255, (alpha * 1.25).astype(np.int64))
+    frame_ops[:, 1:, 0] = x[:, None] + flare_dx
+    frame_ops[:, 1:, 1] = y[:, None] + flare_dy
+    frame_ops[:, 1:, 4] = flare_a
+    frame_ops = frame_ops[np.hstack((always, flare_a > 0))]
+
+    frame, glow, shadow = _twinkle_buffers()
+    for buffer in (frame, glow, shadow):
+        buffer.fill(0)
+    _paint_disks(frame, frame_ops)
+    _paint_disks(glow, glow_ops)
+    _paint_disks(shadow, shadow_ops)
+
+    # Blur runs per channel, so blurring L/LA buffers matches blurring the equivalent RGBA
+    # layers while touching half (glow) or a quarter (shadow) of the bytes.
+    shadow_image = Image.new("RGBA", (FRAME_WIDTH, FRAME_HEIGHT), (0, 0, 0, 0))
+    shadow_image.putalpha(Image.fromarray(shadow).filter(ImageFilter.GaussianBlur(radius=1.05)))
+    glow_image = Image.fromarray(glow).filter(ImageFilter.GaussianBlur(radius=0.75)).convert("RGBA")
+    composite = Image.alpha_composite(
+        Image.alpha_composite(shadow_image, glow_image), Image.fromarray(frame).convert("RGBA")
+    )
+    return np.asarray(composite)
+
+
+def _pack_twinkle_stars(
+    stars: list[tuple[float, float, list[tuple[float, float]], int, int, float, int]],
+) -> TwinkleStars:
+    """
+    Transpose twinkle star tuples into a `TwinkleStars` struct of arrays.
+    """
+
+    x01 = np.asarray([star[0] for star in stars], dtype=np.float64)
+    y01 = np.asarray([star[1] for star in stars], dtype=np.float64)
+    events = [event for star in stars for event in star[2]]
+    event_counts = np.asarray([len(star[2]) for star in stars], dtype=np.int64)
+    return TwinkleStars(
+        x=(x01 * (FRAME_WIDTH - 1)).astype(np.int64),
+        y=(y01 * (FRAME_HEIGHT - 1)).astype(np.int64),
+        fade=_edge_fade_alpha(x01),
+        peak_alpha=np.asarray([star[3] for star in stars], dtype=np.int64),
+        glow_r=np.asarray([star[4] for star in stars], dtype=np.int64),
+        power=np.asarray([star[5] for star in stars], dtype=np.float64),
+        style=np.asarray([star[6] for star in stars], dtype=np.int8),
+        event_start=np.cumsum(event_counts) - event_counts,
+        event_center=np.asarray([center for center, _half in events], dtype=np.float64),
+        event_half_width=np.asarray([half for _center, half in events], dtype=np.float64),
+    )
+
+
+def _twinkle_alpha_table(stars: TwinkleStars) -> np.ndarray:
+    """
+    Per-frame star alpha as a uint8 (FRAME_COUNT, len(stars)) table.
+
+    Evaluates every star's raised-cosine envelopes for all frames at once:
+    - 1.0 at an event center, smoothly fading to 0.0 at the event edges
+    - a star's intensity is its strongest event, shaped by `power`
+    - alpha = peak_alpha * intensity * edge fade, truncated like `int()`
+    """
+
+    if len(stars.x) == 0:
+        return np.zeros((FRAME_COUNT, 0), np.uint8)
 
-def _frames_to_sheet(frames: list[Image.Image]) -> Image.Image:
+    # Frame count uses the last frame as a duplicate of the first for a seamless wrap.
+    frame_index = np.arange(FRAME_COUNT)
+    t = (frame_index % (FRAME_COUNT - 1)) / float(FRAME_COUNT - 1)
+
+    center = stars.event_center
+    half_width = stars.event_half_width
+    dt = np.abs(t[:, None] - center[None, :])
+    dt = np.minimum(dt, 1.0 - dt)  # wrap-around distance for looping
+
+    # Most events cover a fraction of the loop; the cosine (and the power below) only runs for
+    # the (frame, event) pairs inside an event's band, everything else stays 0.
+    frame_hit, event_hit = np.nonzero(dt < half_width)
+    x = dt[frame_hit, event_hit] / np.maximum(1e-6, half_width[event_hit])
+    envelope = np.zeros_like(dt)
+    envelope[frame_hit, event_hit] = 0.5 * (1.0 + np.cos(np.pi * x))
+    best = np.maximum.reduceat(envelope, stars.event_start, axis=1)
+
+    intensity = np.zeros_like(best)
+    np.power(best, stars.power, out=intensity, where=best > 0.0)
+    # peak_alpha <= 255 and intensity, fade <= 1, so alphas fit uint8; the float -> uint8 cast
+    # truncates like `int()`.
+    return (stars.peak_alpha * intensity * stars.fade).astype(np.uint8)
+
+
+def _alpha_composite(dst: np.ndarray, src: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+    """
+    `Image.alpha_composite` for (..., 4) uint8 arrays, bit-exact with Pillow's integer math.
+
+    `dst` broadcasts against `src`, so one base frame composites under a whole (N, H, W, 4) stack.
+    Only pixels where `src` has coverage are blended (Pillow copies `dst` where src alpha is 0),
+    which skips most of a sparse twinkle frame. The result goes to `out` when given.
+    """
+
+    dst = np.broadcast_to(dst, src.shape)
+    if out is None:
+        out = dst.copy()
+    else:
+        out[...] = dst
+    # Index the covered pixels once for every frame in the batch. A flat nonzero over the
+    # contiguous mask, split into per-axis indices, is far cheaper than boolean-masking the
+    # (possibly strided) 4-channel arrays three times.
+    rest = np.flatnonzero(src[..., 3] != 0)
+    axes = []
+    for size in reversed(src.shape[1:-1]):
+        rest, pos = np.divmod(rest, size)
+        axes.append(pos)
+    covered = (rest, *reversed(axes))
+    s = src[covered].astype(np.uint32)
+    d = dst[covered].astype(np.uint32)
+    src_a = s[:, 3]
+    # Pillow: 7 extra precision bits; x / 255 rounded as ((x >> 8) + x) >> 8 after adding 0x80.
+    out_a255 = src_a * 255 + d[:, 3] * (255 - src_a)
+    coef1 = (src_a * (255 * 255 << 7) // out_a255)[:, None]
+    coef2 = (255 << 7) - coef1
+    rgb = s[:, :3] * coef1 + d[:, :3] * coef2 + (0x80 << 7)
+    blended = np.empty_like(s)
+    blended[:, :3] = (((rgb >> 8) + rgb) >> 8) >> 7
+    alpha = out_a255 + 0x80
+    blended[:, 3] = ((alpha >> 8) + alpha) >> 8
+    out[covered] = blended
+    return out
+
+
+def _twinkle_role_grid(*groups: tuple[int, np.ndarray]) -> np.ndarray:
+    """
+    (H, W) uint8 map of twinkle roles keyed by rounded point coordinates.
+
+    `np.rint` rounds half to even like `round()`; groups are written in order, so a later role
+    wins when two points round to the same pixel.
+    """
+
+    grid = np.full((FRAME_HEIGHT, FRAME_WIDTH), ROLE_OTHER, np.uint8)
+    for role, pts in groups:
+        xy = np.rint(pts).astype(np.intp)
+        grid[xy[:, 1], xy[:, 0]] = role
+    return grid
+
+
+def _frames_to_sheet(rows: np.ndarray) -> np.ndarray:
     # Stack frames vertically to avoid Cairo pattern-size limits hit with very wide horizontal
-    # sprite sheets when `background-size` scales the sheet to large center spans.
-    sheet = Image.new("RGBA", (FRAME_WIDTH, FRAME_HEIGHT * len(frames)), (0, 0, 0, 0))
-    for idx, frame in enumerate(frames):
-        sheet.paste(frame, (0, idx * FRAME_HEIGHT))
-    return sheet
+    # sprite sheets when `background-size` scales the sheet to large center spans. Takes the
+    # (N, H, 1 + W * 4) scanlines of `_scanline_buffer`, so this is a view rather than a copy.
+    return rows.reshape(-1, rows.shape[-1])
+
+
+ASSET_NAMES = ("starlight_base.png", "starlight_twinkle_sheet.png", "starlight_sheet.png")
+# Written next to the PNGs once they are all generated; holds `_inputs_key()`.
+CACHE_KEY_NAME = ".starlight.cache"
+
+
+def _inputs_key(*, release: bool) -> str:
+    """
+    Fingerprint of everything that determines the output pixels.
+
+    The script source covers every seed and tuning constant; library versions cover changes in
+    Pillow's blur/compositing or NumPy's bit generator. The encoder mode is included so a quick
+    development build never satisfies a `--release` run.
+    """
+
+    digest = hashlib.blake2b(Path(__file__).read_bytes(), digest_size=16)
+    digest.update(f"Pillow {PIL.__version__} NumPy {np.__version__} release={release}".encode())
+    return digest.hexdigest()
+
+
+def _assets_current(assets_dir: Path, key: str) -> bool:
+    if not all((assets_dir / name).is_file() for name in ASSET_NAMES):
+        return False
+    try:
+        return (assets_dir / CACHE_KEY_NAME).read_text(encoding="utf-8").strip() == key
+    except OSError:
+        return False
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate the Waybar starlight PNG assets.")
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="regenerate even if the assets match the current script and library versions",
+    )
+    parser.add_argument(
+        "--release",
+        action="store_true",
+        help="encode with the slow PNG optimizer (use for assets that get committed)",
+    )
+    args = parser.parse_args(argv)
 
+    level = PNG_DEV_COMPRESS_LEVEL
+    raw_level = os.environ.get(PNG_COMPRESS_ENV, "").strip()
+    if raw_level:
+        if not (raw_level.isdigit() and 0 <= int(raw_level) <= 9):
+            parser.error(f"{PNG_COMPRESS_ENV} must be a zlib level 0-9, got {raw_level!r}")
+        level = int(raw_level)
+    write_png = functools.partial(_write_png, release=args.release, level=level)
 
-def main() -> int:
     repo_dir = Path(__file__).resolve().parent.parent
     assets_dir = repo_dir / "assets"
 
+    key = _inputs_key(release=args.release)
+    if not args.force and _assets_current(assets_dir, key):
+        print(f"starlight assets are up to date ({assets_dir})")
+        return 0
+
     # Base starfield: faint always-on depth layer.
     base_rng = random.Random(BASE_SEED)
     base_points = _poisson_sample(
@@ -608,22 +1341,20 @@ def main() -> int:
         height=FRAME_HEIGHT,
         min_dist_px=BASE_MIN_DIST_PX,
         max_attempts=BASE_STAR_EXTRA_RIGHT * 3500,
-        existing_points=base_points + base_extra_left_points,
+        existing_points=np.concatenate((base_points, base_extra_left_points)),
         x_min=FRAME_WIDTH * 0.65,
         x_max=float(FRAME_WIDTH - 1),
     )
 
-    def bin_index(x: float) -> int:
-        bin_w = FRAME_WIDTH / float(BASE_BIN_COUNT)
-        return max(0, min(BASE_BIN_COUNT - 1, int(x / bin_w)))
-
-    base_all_points = base_points + base_extra_left_points + base_extra_right_points
-    bin_counts = [0] * BASE_BIN_COUNT
-    for x, _y in base_all_points:
-        bin_counts[bin_index(x)] += 1
+    base_all_points = np.concatenate((base_points, base_extra_left_points, base_extra_right_points))
+    bin_w = FRAME_WIDTH / float(BASE_BIN_COUNT)
+    # x >= 0, so the integer cast truncates like `int(x / bin_w)`.
+    bins = np.clip((base_all_points[:, 0] / bin_w).astype(np.int64), 0, BASE_BIN_COUNT - 1)
+    bin_counts = np.bincount(bins, minlength=BASE_BIN_COUNT).tolist()
 
     balance_rng = random.Random(BASE_SEED + 5150)
-    balance_points: list[tuple[float, float]] = []
+    balance_chunks: list[np.ndarray] = []
+    balance_existing = base_all_points
     total_added = 0
     for b, count in enumerate(bin_counts):
         if total_added >= BASE_BALANCE_MAX_TOTAL:
@@ -641,12 +1372,14 @@ def main() -> int:
             height=FRAME_HEIGHT,
             min_dist_px=BASE_MIN_DIST_PX,
             max_attempts=need * 6000,
-            existing_points=base_all_points + balance_points,
+            existing_points=balance_existing,
             x_min=x0,
             x_max=x1,
         )
-        balance_points.extend(pts)
+        balance_chunks.append(pts)
+        balance_existing = np.concatenate((balance_existing, pts))
         total_added += len(pts)
+    balance_points = np.concatenate(balance_chunks) if balance_chunks else np.empty((0, 2))
     base_layer = _draw_starfield(
         rng=base_rng,
         count=BASE_STAR_COUNT,
@@ -659,8 +1392,8 @@ def main() -> int:
         min_dist_px=BASE_MIN_DIST_PX,
         points=base_points,
     )
-    if base_extra_left_points:
-        base_layer_extra = _draw_starfield(
+    if len(base_extra_left_points):
+        _draw_starfield(
             rng=extra_left_rng,
             count=len(base_extra_left_points),
             base_alpha=12,
@@ -669,10 +1402,10 @@ def main() -> int:
             height=FRAME_HEIGHT,
             min_dist_px=BASE_MIN_DIST_PX,
             points=base_extra_left_points,
+            onto=base_layer,
         )
-        base_layer = Image.alpha_composite(base_layer, base_layer_extra)
-    if base_extra_right_points:
-        base_layer_extra = _draw_starfield(
+    if len(base_extra_right_points):
+        _draw_starfield(
             rng=extra_right_rng,
             count=len(base_extra_right_points),
             base_alpha=11,
@@ -681,10 +1414,10 @@ def main() -> int:
             height=FRAME_HEIGHT,
             min_dist_px=BASE_MIN_DIST_PX,
             points=base_extra_right_points,
+            onto=base_layer,
         )
-        base_layer = Image.alpha_composite(base_layer, base_layer_extra)
-    if balance_points:
-        base_layer_extra = _draw_starfield(
+    if len(balance_points):
+        _draw_starfield(
             rng=balance_rng,
             count=len(balance_points),
             base_alpha=10,
@@ -693,9 +1426,12 @@ def main() -> int:
             height=FRAME_HEIGHT,
             min_dist_px=BASE_MIN_DIST_PX,
             points=balance_points,
+            onto=base_layer,
         )
-        base_layer = Image.alpha_composite(base_layer, base_layer_extra)
-    _write_png(assets_dir / "starlight_base.png", base_layer)
+    base_pixels = np.asarray(base_layer)
+    base_rows, base_view = _scanline_buffer(height=FRAME_HEIGHT, width=FRAME_WIDTH)
+    base_view[...] = base_pixels
+    write_png(assets_dir / "starlight_base.png", base_rows)
 
     # Twinkle frames: per-star fade across frames.
     # Twinkle point sampling considers the base points to avoid clusters where twinkles sit directly
@@ -711,6 +1447,11 @@ def main() -> int:
         max_attempts=TWINKLE_STAR_COUNT * 3500,
         existing_points=base_points,
     )
+    # Seed set for the side-band tiers below, grown as tiers are accepted. It holds both side
+    # supplements: the bands (x <= 35% / x >= 65% of the width) are hundreds of pixels apart, far
+    # beyond any tier's spacing, so the other side's points never affect a band's sampling.
+    band_existing = np.concatenate((base_all_points, twinkle_points))
+
     # Add a small number of twinkles on the left to match the base supplementation.
     twinkle_extra_rng = random.Random(BASE_SEED + 9001 + 4242)
     twinkle_extra_left_points = _poisson_sample(
@@ -720,12 +1461,11 @@ def main() -> int:
         height=FRAME_HEIGHT,
         min_dist_px=TWINKLE_MIN_DIST_PX,
         max_attempts=TWINKLE_STAR_EXTRA_LEFT * 4500,
-        existing_points=base_points + base_extra_left_points + twinkle_points,
+        existing_points=band_existing,
         x_min=0.0,
         x_max=FRAME_WIDTH * 0.35,
     )
-    if twinkle_extra_left_points:
-        twinkle_points = twinkle_points + twinkle_extra_left_points
+    band_existing = np.concatenate((band_existing, twinkle_extra_left_points))
 
     # Right-side supplementation mirrors the left-side fill so both sides of the clock keep
     # twinkling activity throughout the loop.
@@ -737,72 +1477,50 @@ def main() -> int:
         height=FRAME_HEIGHT,
         min_dist_px=TWINKLE_MIN_DIST_PX,
         max_attempts=TWINKLE_STAR_EXTRA_RIGHT * 4500,
-        existing_points=base_points + base_extra_right_points + twinkle_points,
+        existing_points=band_existing,
         x_min=FRAME_WIDTH * 0.65,
         x_max=float(FRAME_WIDTH - 1),
     )
-    if twinkle_extra_right_points:
-        twinkle_points = twinkle_points + twinkle_extra_right_points
+    band_existing = np.concatenate((band_existing, twinkle_extra_right_points))
 
     # Anchor points are sampled independently to guarantee consistent activity on both sides while
     # keeping spacing higher than the main twinkles to avoid a "snow" look.
     anchor_rng = random.Random(BASE_SEED + 9001 + 7777)
-    anchor_left_points = _poisson_sample(
+    anchor_left_points, anchor_right_points = _poisson_sample_sides(
         rng=anchor_rng,
-        count=TWINKLE_ANCHOR_STARS_PER_SIDE,
+        count_per_side=TWINKLE_ANCHOR_STARS_PER_SIDE,
         width=FRAME_WIDTH,
         height=FRAME_HEIGHT,
         min_dist_px=TWINKLE_ANCHOR_MIN_DIST_PX,
-        max_attempts=TWINKLE_ANCHOR_STARS_PER_SIDE * 9000,
-        existing_points=base_points + base_extra_left_points + twinkle_points,
-        x_min=0.0,
-        x_max=FRAME_WIDTH * 0.35,
+        max_attempts_per_side=TWINKLE_ANCHOR_STARS_PER_SIDE * 9000,
+        existing_points=band_existing,
     )
-    anchor_right_points = _poisson_sample(
-        rng=anchor_rng,
-        count=TWINKLE_ANCHOR_STARS_PER_SIDE,
-        width=FRAME_WIDTH,
-        height=FRAME_HEIGHT,
-        min_dist_px=TWINKLE_ANCHOR_MIN_DIST_PX,
-        max_attempts=TWINKLE_ANCHOR_STARS_PER_SIDE * 9000,
-        existing_points=base_points + base_extra_right_points + twinkle_points + anchor_left_points,
-        x_min=FRAME_WIDTH * 0.65,
-        x_max=float(FRAME_WIDTH - 1),
-    )
-    if anchor_left_points:
-        twinkle_points = twinkle_points + anchor_left_points
-    if anchor_right_points:
-        twinkle_points = twinkle_points + anchor_right_points
+    band_existing = np.concatenate((band_existing, anchor_left_points, anchor_right_points))
 
     # Macro points are sampled independently with a higher separation to avoid clumps. These are
     # merged into the twinkle pool so the renderer can schedule them as larger/brighter twinkles.
     macro_rng = random.Random(BASE_SEED + 9001 + 8888)
-    macro_left_points = _poisson_sample(
+    macro_left_points, macro_right_points = _poisson_sample_sides(
         rng=macro_rng,
-        count=TWINKLE_MACRO_STARS_PER_SIDE,
+        count_per_side=TWINKLE_MACRO_STARS_PER_SIDE,
         width=FRAME_WIDTH,
         height=FRAME_HEIGHT,
         min_dist_px=TWINKLE_MACRO_MIN_DIST_PX,
-        max_attempts=TWINKLE_MACRO_STARS_PER_SIDE * 20000,
-        existing_points=base_points + base_extra_left_points + twinkle_points,
-        x_min=0.0,
-        x_max=FRAME_WIDTH * 0.35,
+        max_attempts_per_side=TWINKLE_MACRO_STARS_PER_SIDE * 20000,
+        existing_points=band_existing,
     )
-    macro_right_points = _poisson_sample(
-        rng=macro_rng,
-        count=TWINKLE_MACRO_STARS_PER_SIDE,
-        width=FRAME_WIDTH,
-        height=FRAME_HEIGHT,
-        min_dist_px=TWINKLE_MACRO_MIN_DIST_PX,
-        max_attempts=TWINKLE_MACRO_STARS_PER_SIDE * 20000,
-        existing_points=base_points + base_extra_right_points + twinkle_points + macro_left_points,
-        x_min=FRAME_WIDTH * 0.65,
-        x_max=float(FRAME_WIDTH - 1),
+    # Every tier joins the twinkle pool in sampling order (the renderer's shuffle depends on it).
+    twinkle_points = np.concatenate(
+        (
+            twinkle_points,
+            twinkle_extra_left_points,
+            twinkle_extra_right_points,
+            anchor_left_points,
+            anchor_right_points,
+            macro_left_points,
+            macro_right_points,
+        )
     )
-    if macro_left_points:
-        twinkle_points = twinkle_points + macro_left_points
-    if macro_right_points:
-        twinkle_points = twinkle_points + macro_right_points
 
     # Sparkle points are sampled last with a large separation so they remain rare glints.
     sparkle_rng = random.Random(BASE_SEED + 9001 + 9999)
@@ -813,26 +1531,36 @@ def main() -> int:
         height=FRAME_HEIGHT,
         min_dist_px=TWINKLE_SPARKLE_MIN_DIST_PX,
         max_attempts=TWINKLE_SPARKLE_STAR_COUNT * 25000,
-        existing_points=base_points + twinkle_points,
+        existing_points=np.concatenate((base_points, twinkle_points)),
     )
-    if sparkle_points:
-        twinkle_points = twinkle_points + sparkle_points
-
-    twinkle_kinds: dict[tuple[int, int], str] = {}
-    for x_f, y_f in anchor_left_points + anchor_right_points:
-        twinkle_kinds[(int(round(x_f)), int(round(y_f)))] = "anchor"
-    for x_f, y_f in macro_left_points + macro_right_points:
-        twinkle_kinds[(int(round(x_f)), int(round(y_f)))] = "macro"
-    for x_f, y_f in sparkle_points:
-        twinkle_kinds[(int(round(x_f)), int(round(y_f)))] = "sparkle"
+    twinkle_points = np.concatenate((twinkle_points, sparkle_points))
 
-    twinkle_frames = _render_twinkle_frames(seed=twinkle_seed, points=twinkle_points, kinds=twinkle_kinds)
-    _write_png(assets_dir / "starlight_twinkle_sheet.png", _frames_to_sheet(twinkle_frames))
+    twinkle_roles = _twinkle_role_grid(
+        (ROLE_ANCHOR, np.concatenate((anchor_left_points, anchor_right_points))),
+        (ROLE_MACRO, np.concatenate((macro_left_points, macro_right_points))),
+        (ROLE_SPARKLE, sparkle_points),
+    )
 
+    # Both sheets share one scanline buffer: frames render and composite straight into it and
+    # the PNG writer compresses its rows without further copies.
+    sheet_rows, sheet_pixels = _scanline_buffer(2, FRAME_COUNT, height=FRAME_HEIGHT, width=FRAME_WIDTH)
+    twinkle_frames = _render_twinkle_frames(
+        seed=twinkle_seed, points=twinkle_points, roles=twinkle_roles, out=sheet_pixels[0]
+    )
     # Combined sheet: base+twinkle per frame, so CSS only needs to animate a single background.
-    combined_frames = [Image.alpha_composite(base_layer, frame) for frame in twinkle_frames]
-    _write_png(assets_dir / "starlight_sheet.png", _frames_to_sheet(combined_frames))
-
+    _alpha_composite(base_pixels, twinkle_frames, out=sheet_pixels[1])
+
+    # zlib and Pillow's encoder release the GIL, so the two sheet encodes overlap on two cores.
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        writes = [
+            pool.submit(write_png, assets_dir / name, _frames_to_sheet(rows))
+            for name, rows in zip(("starlight_twinkle_sheet.png", "starlight_sheet.png"), sheet_rows)
+        ]
+        for write in writes:
+            write.result()
+
+    # Recorded last so an interrupted run is never mistaken for a complete one.
+    (assets_dir / CACHE_KEY_NAME).write_text(key + "\n", encoding="utf-8")
     return 0
 
 
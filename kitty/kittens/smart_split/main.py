@@ -14,16 +14,26 @@ from __future__ import annotations
 
 import os
 import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
 
 from kittens.tui.handler import result_handler
 from kitty.fast_data_types import add_timer
 from kitty.typing_compat import BossType
 
-from smart_split_hyprland import split_repaint_focus_bounce
+from smart_split_hyprland import (
+    split_repaint_bounce_needed,
+    split_repaint_focus_bounce,
+    split_repaint_focus_bounce_async,
+)
 from smart_split_kitty import (
     active_tab,
     active_tab_manager,
+    active_window_id,
     close_active_window,
+    focus_window,
+    move_window_to_edge,
+    reset_window_sizes,
     tab_window_ids,
     window_count,
 )
@@ -41,7 +51,9 @@ from smart_split_layout import (
     three_pane_layout_inverted,
 )
 from smart_split_state import (
+    SmartSplitState,
     ensure_state,
+    poll_until,
     sync_window_order,
     wait_for_window_ids_change,
     wait_for_window_ids_settle,
@@ -50,6 +62,20 @@ from smart_split_state import (
 WIDTH_DELTA_CELLS = 8
 HEIGHT_DELTA_CELLS = 4
 _OS_RESIZE_ENV = "KITTY_SMART_SPLIT_OS_RESIZE"
+_TRUTHY_SETTINGS = frozenset({"1", "true", "yes", "on"})
+_VALID_ORIENTATIONS = frozenset({"hsplit", "vsplit", "auto"})
+_VALID_MODES = frozenset(
+    {"split", "grow", "shrink", "close_window", "close_tab", "normalize"}
+)
+# Modes that remove panes or undo an OS window expansion.
+_SHRINK_MODES = frozenset({"shrink", "close_window", "close_tab"})
+_SPLIT_MODES = frozenset({"split", "grow"})
+# Auto orientation by current pane count: (launch location, move new pane to bottom).
+_AUTO_SPLITS = {
+    1: ("vsplit", False),  # first split: left/right
+    2: ("hsplit", True),  # create a third pane, then move it to the bottom edge
+    3: ("vsplit", False),
+}
 
 
 def main(args: list[str]) -> list[str]:
@@ -64,12 +90,31 @@ def _os_resize_enabled() -> bool:
     Resizing is opt-in to avoid compositor geometry artifacts on split/close.
     """
     setting = os.environ.get(_OS_RESIZE_ENV, "0").strip().lower()
-    return setting in ("1", "true", "yes", "on")
+    return setting in _TRUTHY_SETTINGS
+
+
+def _same_ids(order: list[int], window_ids: list[int]) -> bool:
+    """
+    Return True when `order` holds exactly the ids in `window_ids`, in any order.
+
+    The common case (order already current) is a plain list compare; otherwise a
+    single set is consumed as ids are matched, which also rejects duplicates.
+    """
+    if order == window_ids:
+        return True
+    if len(order) != len(window_ids):
+        return False
+    remaining = set(window_ids)
+    for wid in order:
+        if wid not in remaining:
+            return False
+        remaining.remove(wid)
+    return not remaining
 
 
 def _ensure_order(
     tab,
-    state: dict,
+    state: SmartSplitState,
     current_ids: list[int] | None = None,
 ) -> list[int]:
     """
@@ -78,19 +123,51 @@ def _ensure_order(
     The order is stored in state and rebuilt when stale.
     """
     window_ids = current_ids if current_ids is not None else tab_window_ids(tab)
-    order = state.get("order")
-    if not isinstance(order, list):
-        order = []
-    if len(order) != len(window_ids) or set(order) != set(window_ids):
+    order = state.order
+    if not _same_ids(order, window_ids):
         # Prefer a stable creation order before falling back to geometry.
         order = sync_window_order(state, window_ids, previous_ids=window_ids)
-        if len(order) != len(window_ids) or set(order) != set(window_ids):
+        if not _same_ids(order, window_ids):
             # Fall back to geometry ordering when ids cannot be reconciled.
             order = order_by_geometry(tab, window_ids)
-    state["order"] = order
+    state.order = order
     return order
 
 
+def _merge_order(preferred: list[int], window_ids: list[int]) -> list[int]:
+    """
+    Return `preferred` limited to `window_ids`, followed by any ids it lacks.
+
+    Membership uses a set and `dict.fromkeys` dedups in one ordered pass, so the merge
+    stays linear in the number of windows.
+    """
+    present = set(window_ids)
+    return list(dict.fromkeys([wid for wid in preferred if wid in present] + window_ids))
+
+
+def _without(order: list[int], window_id: int) -> tuple[list[int], int | None]:
+    """
+    Return `order` without `window_id` and the slot index it occupied, if any.
+
+    A single walk replaces the membership test, `.index()` lookup and filter pass.
+    """
+    remaining: list[int] = []
+    index: int | None = None
+    for position, wid in enumerate(order):
+        if wid == window_id:
+            if index is None:
+                index = position
+        else:
+            remaining.append(wid)
+    return remaining, index
+
+
+def _parse_int(token: str) -> int | None:
+    """Return `token` as an int when it is a signed decimal, without raising."""
+    digits = token[1:] if token[:1] in ("-", "+") else token
+    return int(token) if digits.isdecimal() else None
+
+
 def _parse_args(args: list[str]) -> tuple[int, str, str]:
     """
     Parse kitten arguments while accounting for the injected kitten name.
@@ -103,24 +180,16 @@ def _parse_args(args: list[str]) -> tuple[int, str, str]:
     mode = "split"
 
     param_args = args
-    if args and not args[0].lstrip("-").isdigit():
+    if args and _parse_int(args[0]) is None:
         param_args = args[1:]
 
     if param_args:
-        try:
-            max_windows = int(param_args[0])
-        except Exception:
-            pass
-        if len(param_args) > 1 and param_args[1] in ("hsplit", "vsplit", "auto"):
+        parsed = _parse_int(param_args[0])
+        if parsed is not None:
+            max_windows = parsed
+        if len(param_args) > 1 and param_args[1] in _VALID_ORIENTATIONS:
             orientation = param_args[1]
-        if len(param_args) > 2 and param_args[2] in (
-            "split",
-            "grow",
-            "shrink",
-            "close_window",
-            "close_tab",
-            "normalize",
-        ):
+        if len(param_args) > 2 and param_args[2] in _VALID_MODES:
             mode = param_args[2]
 
     return max_windows, orientation, mode
@@ -156,76 +225,136 @@ def _focus_after_close(
     return order[fallback_index]
 
 
+def _run_when(
+    predicate: Callable[[], bool],
+    callback: Callable[[], None],
+    *,
+    timeout: float,
+    initial: float = 0.002,
+    max_step: float = 0.03,
+) -> None:
+    """
+    Run `callback` on kitty's event loop once `predicate` holds or `timeout` passes.
+
+    Checks are rescheduled with add_timer instead of sleeping, so kitty can process
+    the pending change between polls; delays double from `initial` to `max_step`.
+    """
+    deadline = time.monotonic() + timeout
+    step = initial
+
+    def check(_timer_id: int | None) -> None:
+        nonlocal step
+        remaining = deadline - time.monotonic()
+        if remaining > 0 and not predicate():
+            add_timer(check, min(step, remaining), False)
+            step = min(step * 2, max_step)
+            return
+        callback()
+
+    add_timer(check, 0.0, False)
+
+
 def _wait_for_group_ids(tab, window_ids: list[int]) -> None:
     """Wait briefly for window group ids to become available."""
-    for _ in range(12):
-        if group_ids_ready(tab, window_ids):
-            return
-        time.sleep(0.03)
+    poll_until(lambda: group_ids_ready(tab, window_ids), timeout=0.36)
 
 
-def _schedule_normalize_after_close(
-    boss: BossType,
-    tab,
-    state: dict,
-    before_ids: list[int],
-    os_window_id: int | None,
-    order_after: list[int] | None,
-    closed_index: int | None,
-) -> None:
+@dataclass(slots=True)
+class _CloseNormalizer:
     """
-    Normalize the layout after a close once the window list has updated.
+    Inputs for one post-close normalization pass, run later from kitty's event loop.
 
-    The delay prevents the normalization step from racing kitty's close handling.
+    `os_resize` is the caller's `_os_resize_enabled()` result for this invocation.
     """
 
-    def do_normalize(_timer_id: int | None) -> None:
-        after_ids = wait_for_window_ids_change(tab, before_ids)
-        if order_after:
-            expected_count = len(order_after)
+    boss: BossType
+    tab: object
+    state: SmartSplitState
+    before_ids: list[int]
+    os_window_id: int | None
+    order_after: list[int] | None
+    closed_index: int | None
+    os_resize: bool
+    # Slot orders decoded from the splits tree; cleared after every layout mutation.
+    _canonical_cache: dict[tuple[int, ...], list[int] | None] = field(
+        default_factory=dict
+    )
+
+    def _canonical(self, ids: list[int]) -> list[int] | None:
+        key = tuple(ids)
+        cache = self._canonical_cache
+        if key not in cache:
+            cache[key] = canonical_order_from_pairs(self.tab, ids)
+        return cache[key]
+
+    def _shape_matches(self, ids: list[int]) -> bool:
+        # A decoded canonical order already proves the tree has the canonical shape.
+        if self._canonical_cache.get(tuple(ids)):
+            return True
+        return layout_shape_matches(self.tab, len(ids))
+
+    def _wait_for_count(self, expected_count: int) -> list[int]:
+        """Poll the window list until it holds `expected_count` ids or times out."""
+        tab = self.tab
+        after_ids: list[int] = []
+
+        def count_reached() -> bool:
+            nonlocal after_ids
+            after_ids = tab_window_ids(tab)
+            return len(after_ids) == expected_count
+
+        poll_until(count_reached, timeout=0.9)
+        return after_ids
+
+    def window_list_changed(self) -> bool:
+        """Return True once the window list no longer matches `before_ids`."""
+        return not _same_ids(tab_window_ids(self.tab), self.before_ids)
+
+    def run(self) -> None:
+        """Normalize the remaining panes and restore focus after the close."""
+        # The body reads these on every step; plain locals keep the lookups cheap.
+        boss = self.boss
+        tab = self.tab
+        state = self.state
+        before_ids = self.before_ids
+        os_window_id = self.os_window_id
+        order_after = self.order_after
+        closed_index = self.closed_index
+        os_resize = self.os_resize
+
+        # The scheduler already waited (up to its timeout) for the list to change.
+        after_ids = tab_window_ids(tab)
+        if order_after and len(after_ids) != len(order_after):
             # Await the expected window count to avoid racing the close path.
-            for _ in range(30):
-                if len(after_ids) == expected_count:
-                    break
-                time.sleep(0.03)
-                after_ids = tab_window_ids(tab)
-        after_ids = wait_for_window_ids_settle(tab)
+            after_ids = self._wait_for_count(len(order_after))
+        # The last read seeds the settle check instead of walking the tab again.
+        after_ids = wait_for_window_ids_settle(tab, after_ids)
         _wait_for_group_ids(tab, after_ids)
-        order: list[int] = []
-        if order_after:
-            order = [wid for wid in order_after if wid in after_ids]
-        if len(order) != len(after_ids) or set(order) != set(after_ids):
-            # Preserve the post-close rotation order when possible.
-            order = [wid for wid in order if wid in after_ids]
-            for wid in after_ids:
-                if wid not in order:
-                    order.append(wid)
-        if len(order) != len(after_ids) or set(order) != set(after_ids):
+        # Preserve the post-close rotation order when possible.
+        order = _merge_order(order_after or [], after_ids)
+        if not _same_ids(order, after_ids):
             order = sync_window_order(state, after_ids, previous_ids=before_ids)
         # Apply the canonical layout to prevent stacked or nested splits.
         order = normalize_layout(tab, order)
-        canonical_after = canonical_order_from_pairs(tab, after_ids)
+        self._canonical_cache.clear()
+        canonical_after = self._canonical(after_ids)
         if canonical_after:
             # Keep state aligned with the canonical slot order after close.
             order = canonical_after
-        if not layout_shape_matches(tab, len(after_ids)):
+        if not self._shape_matches(after_ids):
             # Retry once after the layout settles; prefer explicit rotation order over geometry.
             after_ids = wait_for_window_ids_settle(tab)
             _wait_for_group_ids(tab, after_ids)
             if order_after:
                 # Preserve the intended post-close slot rotation during recovery.
-                order = [wid for wid in order_after if wid in after_ids]
-                for wid in after_ids:
-                    if wid not in order:
-                        order.append(wid)
+                order = _merge_order(order_after, after_ids)
             elif geometry_ready(tab, after_ids):
                 order = order_by_geometry(tab, after_ids)
             else:
                 order = sync_window_order(state, after_ids, previous_ids=before_ids)
             order = normalize_layout(tab, order)
-            canonical_after = (
-                canonical_order_from_pairs(tab, after_ids) or canonical_after
-            )
+            self._canonical_cache.clear()
+            canonical_after = self._canonical(after_ids) or canonical_after
             if canonical_after:
                 order = canonical_after
         if len(after_ids) == 3 and three_pane_layout_inverted(tab, after_ids):
@@ -233,10 +362,7 @@ def _schedule_normalize_after_close(
             recovery_order: list[int] = []
             if order_after:
                 # Favor the rotation queue so the visual progression remains stable.
-                recovery_order = [wid for wid in order_after if wid in after_ids]
-                for wid in after_ids:
-                    if wid not in recovery_order:
-                        recovery_order.append(wid)
+                recovery_order = _merge_order(order_after, after_ids)
             elif canonical_after and len(canonical_after) == 3:
                 recovery_order = canonical_after
             elif geometry_ready(tab, after_ids):
@@ -245,18 +371,19 @@ def _schedule_normalize_after_close(
                 recovery_order = sync_window_order(
                     state, after_ids, previous_ids=before_ids
                 )
-            for _ in range(3):
+            for attempt in range(3):
+                if attempt:
+                    # Give kitty a moment to settle before rewriting the tree again.
+                    time.sleep(0.03)
                 order = normalize_layout(tab, recovery_order)
-                canonical_after = (
-                    canonical_order_from_pairs(tab, after_ids) or canonical_after
-                )
+                self._canonical_cache.clear()
+                canonical_after = self._canonical(after_ids) or canonical_after
                 if canonical_after:
                     order = canonical_after
-                if layout_shape_matches(tab, 3) and not three_pane_layout_inverted(
+                if self._shape_matches(after_ids) and not three_pane_layout_inverted(
                     tab, after_ids
                 ):
                     break
-                time.sleep(0.03)
         left_right_order: list[int] | None = None
         if canonical_after:
             left_right_order = canonical_after
@@ -266,48 +393,40 @@ def _schedule_normalize_after_close(
         should_force_left_right = (
             len(after_ids) == 2
             and left_right_order
-            and not layout_shape_matches(tab, 2)
+            and not self._shape_matches(after_ids)
         )
-        if should_force_left_right:
-            # Enforce a left/right split after close to avoid stacked panes.
-            try:
-                tab.set_active_window(left_right_order[0])
-                boss.call_remote_control(
-                    None,
-                    ("action", "layout_action", "move_to_screen_edge", "left"),
-                )
-                try:
-                    tab.reset_window_sizes()
-                except Exception:
-                    pass
-                refreshed = canonical_order_from_pairs(tab, after_ids)
-                if refreshed:
-                    order = refreshed
-                    canonical_after = refreshed
-            except Exception:
-                pass
-        state["order"] = order
+        # Enforce a left/right split after close to avoid stacked panes.
+        if should_force_left_right and move_window_to_edge(
+            boss, tab, left_right_order[0], "left"
+        ):
+            reset_window_sizes(tab)
+            self._canonical_cache.clear()
+            refreshed = self._canonical(after_ids)
+            if refreshed:
+                order = refreshed
+                canonical_after = refreshed
         if (
-            _os_resize_enabled()
+            os_resize
             and os_window_id is not None
-            and state["expanded"]
+            and state.expanded
             and len(after_ids) == 1
         ):
             try:
                 boss.resize_os_window(
                     os_window_id,
-                    width=-state["width_delta"],
-                    height=-state["height_delta"],
+                    width=-state.width_delta,
+                    height=-state.height_delta,
                     unit="cells",
                     incremental=True,
                 )
             except Exception:
                 pass
             else:
-                state["expanded"] = False
+                state.expanded = False
             # Re-apply sizing after the OS window resize to avoid stale geometry.
             order = normalize_layout(tab, order)
-            state["order"] = order
+            self._canonical_cache.clear()
+        state.order = order
         focus_id: int | None = None
         focus_id = _focus_after_close(len(before_ids), len(after_ids), closed_index, order)
         if focus_id is None and len(after_ids) == 2:
@@ -319,20 +438,45 @@ def _schedule_normalize_after_close(
                 if len(geometry_order) == 2:
                     focus_id = geometry_order[1]
         if focus_id is not None:
-            try:
-                tab.set_active_window(focus_id)
-            except Exception:
-                pass
+            focus_window(tab, focus_id)
+        if not split_repaint_bounce_needed():
+            return
         # Hyprland/Wayland may skip repaint after close/resize; force a bounce.
         split_repaint_focus_bounce()
         if focus_id is not None:
             # Re-assert focus in case the compositor bounce restores a prior window.
-            try:
-                tab.set_active_window(focus_id)
-            except Exception:
-                pass
+            focus_window(tab, focus_id)
 
-    add_timer(do_normalize, 0.06, False)
+
+def _schedule_normalize_after_close(
+    boss: BossType,
+    tab,
+    state: SmartSplitState,
+    before_ids: list[int],
+    os_window_id: int | None,
+    order_after: list[int] | None,
+    closed_index: int | None,
+    os_resize: bool,
+) -> None:
+    """
+    Normalize the layout after a close once the window list has updated.
+
+    Normalization starts on the first event-loop tick where the window list differs
+    from `before_ids`, so it never races kitty's close handling yet does not sit out
+    a fixed delay.
+    `os_resize` is the caller's `_os_resize_enabled()` result for this invocation.
+    """
+    normalizer = _CloseNormalizer(
+        boss,
+        tab,
+        state,
+        before_ids,
+        os_window_id,
+        order_after,
+        closed_index,
+        os_resize,
+    )
+    _run_when(normalizer.window_list_changed, normalizer.run, timeout=0.6)
 
 
 @result_handler(no_ui=True)
@@ -345,34 +489,43 @@ def handle_result(
     if tab is None:
         return
 
-    tm = active_tab_manager(boss)
-    os_window_id = getattr(tm, "os_window_id", None) if tm is not None else None
     current_ids = tab_window_ids(tab)
     current_window_count = len(current_ids) if current_ids else window_count(tab)
+    # Read the opt-in once; every resize decision below (and the close callback) reuses it.
+    os_resize = _os_resize_enabled()
+    # Bail out on no-op requests before touching the tab manager or kitten state.
+    if mode in _SPLIT_MODES and current_window_count >= max_windows:
+        return
+    if mode == "close_window" and current_window_count <= 1:
+        return
+    if mode == "shrink" and (not os_resize or current_window_count > 2):
+        # Shrink only undoes an OS window expansion, which needs resizing and <= 2 panes.
+        return
+
+    tm = active_tab_manager(boss)
+    os_window_id = getattr(tm, "os_window_id", None) if tm is not None else None
 
     state_key = os_window_id if os_window_id is not None else "__default__"
     state = ensure_state(boss, state_key, WIDTH_DELTA_CELLS, HEIGHT_DELTA_CELLS)
-    if not _os_resize_enabled() and state["expanded"]:
+    if not os_resize and state.expanded:
         # Resizing may be disabled while a prior expansion flag is still set.
-        state["expanded"] = False
+        state.expanded = False
     # Track rotation order based on creation; geometry is used only when stale.
     _ensure_order(tab, state, current_ids)
 
     if mode == "normalize":
         # Normalize after close operations have completed.
-        stable_ids = wait_for_window_ids_settle(tab)
+        stable_ids = wait_for_window_ids_settle(tab, current_ids)
         order = sync_window_order(state, stable_ids)
         order = normalize_layout(tab, order)
-        state["order"] = order
+        state.order = order
         return
 
-    if mode in ("shrink", "close_window", "close_tab"):
-        if mode == "close_window" and current_window_count <= 1:
-            return
+    if mode in _SHRINK_MODES:
         if mode == "shrink":
             should_shrink = (
-                _os_resize_enabled()
-                and state["expanded"]
+                os_resize
+                and state.expanded
                 and current_window_count <= 2
                 and os_window_id is not None
             )
@@ -380,22 +533,23 @@ def handle_result(
                 try:
                     boss.resize_os_window(
                         os_window_id,
-                        width=-state["width_delta"],
-                        height=-state["height_delta"],
+                        width=-state.width_delta,
+                        height=-state.height_delta,
                         unit="cells",
                         incremental=True,
                     )
                 except Exception:
                     pass
                 else:
-                    state["expanded"] = False
+                    state.expanded = False
                 # Keep the layout sized to the resized OS window.
-                order = sync_window_order(state, tab_window_ids(tab))
+                order = sync_window_order(state, current_ids)
                 order = normalize_layout(tab, order)
-                state["order"] = order
+                state.order = order
             return
         if mode == "close_window":
-            before_ids = tab_window_ids(tab)
+            # Nothing has changed the window list since entry; reuse that snapshot.
+            before_ids = current_ids
             canonical_before = canonical_order_from_pairs(tab, before_ids)
             if canonical_before:
                 # Use canonical layout order so close preserves slot rotation.
@@ -405,11 +559,9 @@ def handle_result(
                 order_before = order_by_geometry(tab, before_ids)
             else:
                 order_before = _ensure_order(tab, state, before_ids)
-            closed_index = None
-            if target_window_id in order_before:
-                # Preserve the slot index of the closed pane for focus selection later.
-                closed_index = order_before.index(target_window_id)
-            order_after: list[int] | None = None
+            # Preserve rotation order by removing the closed id from the slot list,
+            # and keep its slot index for focus selection later.
+            order_after, closed_index = _without(order_before, target_window_id)
             if len(before_ids) == 4:
                 # Rotate 4→3 by row-major slot order to preserve the expected progression.
                 slot_order = None
@@ -417,15 +569,11 @@ def handle_result(
                     slot_order = canonical_before
                 elif geometry_ready(tab, before_ids):
                     slot_order = order_by_geometry(tab, before_ids)
-                else:
-                    slot_order = order_before
-                if slot_order and target_window_id in slot_order:
-                    order_before = slot_order
-                    order_after = [wid for wid in slot_order if wid != target_window_id]
-                    closed_index = slot_order.index(target_window_id)
-            # Preserve rotation order by removing the closed id from the slot list.
-            if order_after is None:
-                order_after = [wid for wid in order_before if wid != target_window_id]
+                if slot_order:
+                    slot_after, slot_index = _without(slot_order, target_window_id)
+                    if slot_index is not None:
+                        order_after = slot_after
+                        closed_index = slot_index
             close_active_window(boss, target_window_id)
             _schedule_normalize_after_close(
                 boss,
@@ -435,30 +583,25 @@ def handle_result(
                 os_window_id,
                 order_after,
                 closed_index,
+                os_resize,
             )
         elif mode == "close_tab":
             try:
                 boss.close_tab()
             finally:
-                state["expanded"] = False
-        return
-
-    if mode not in ("split", "grow"):
+                state.expanded = False
         return
 
-    if current_window_count >= max_windows:
+    if mode not in _SPLIT_MODES:
         return
 
     if current_window_count == 3:
         # Restrict 3-pane splits to the bottom slot to avoid square splits.
-        active_window = getattr(tab, "active_window", None)
-        active_window_id = getattr(active_window, "id", None)
+        active_id = active_window_id(tab)
+        if active_id is None:
+            return
         geometry_order = order_by_geometry(tab, current_ids)
-        if (
-            active_window_id is None
-            or len(geometry_order) != 3
-            or active_window_id != geometry_order[2]
-        ):
+        if len(geometry_order) != 3 or active_id != geometry_order[2]:
             return
 
     if active_window_is_square_slot(tab):
@@ -470,41 +613,35 @@ def handle_result(
     except Exception:
         pass
 
-    chosen = orientation if orientation != "auto" else "vsplit"
-    move_bottom = False
-
     if orientation == "auto":
-        if current_window_count == 1:
-            chosen = "vsplit"  # first split: left/right
-        elif current_window_count == 2:
-            # Create a third pane, then move it to the bottom edge.
-            chosen = "hsplit"
-            move_bottom = True
-        elif current_window_count == 3:
-            chosen = "vsplit"
-        else:
-            chosen = "vsplit" if current_window_count % 2 == 0 else "hsplit"
+        chosen, move_bottom = _AUTO_SPLITS.get(current_window_count) or (
+            "vsplit" if current_window_count % 2 == 0 else "hsplit",
+            False,
+        )
+    else:
+        chosen, move_bottom = orientation, False
 
     if (
-        _os_resize_enabled()
+        os_resize
         and current_window_count == 1
         and os_window_id is not None
-        and not state["expanded"]
+        and not state.expanded
     ):
         try:
             boss.resize_os_window(
                 os_window_id,
-                width=state["width_delta"],
-                height=state["height_delta"],
+                width=state.width_delta,
+                height=state.height_delta,
                 unit="cells",
                 incremental=True,
             )
         except Exception:
             pass
         else:
-            state["expanded"] = True
+            state.expanded = True
 
-    before_ids = tab_window_ids(tab)
+    # Layout switches and OS window resizes keep the window set, so the entry snapshot holds.
+    before_ids = current_ids
     # Capture the pre-split order so the rotation queue remains stable.
     order_before = _ensure_order(tab, state, before_ids)
     launch_args = ["--cwd=current", f"--location={chosen}"]
@@ -513,23 +650,20 @@ def handle_result(
     boss.launch(*launch_args)
 
     after_ids = wait_for_window_ids_change(tab, before_ids)
+    settled = False
     if move_bottom:
         new_ids_for_move = [wid for wid in after_ids if wid not in before_ids]
         if len(new_ids_for_move) != 1:
             # If the new pane has not appeared yet, wait for the list to settle.
-            after_ids = wait_for_window_ids_settle(tab)
+            after_ids = wait_for_window_ids_settle(tab, after_ids)
+            settled = True
             new_ids_for_move = [wid for wid in after_ids if wid not in before_ids]
         if len(new_ids_for_move) == 1:
-            try:
-                # Move the newly created pane into the bottom slot for 3-pane layouts.
-                tab.set_active_window(new_ids_for_move[0])
-                boss.call_remote_control(
-                    None,
-                    ("action", "layout_action", "move_to_screen_edge", "bottom"),
-                )
-            except Exception:
-                pass
-    after_ids = wait_for_window_ids_settle(tab)
+            # Move the newly created pane into the bottom slot for 3-pane layouts.
+            move_window_to_edge(boss, tab, new_ids_for_move[0], "bottom")
+    if not settled:
+        # Moving a pane to an edge keeps the window set, so one settle suffices.
+        after_ids = wait_for_window_ids_settle(tab, after_ids)
     new_ids = [wid for wid in after_ids if wid not in before_ids]
     order = []
     if len(new_ids) == 1:
@@ -544,16 +678,20 @@ def handle_result(
                 # Slot order is row-major: top-left, top-right, bottom-left, bottom-right.
                 left_id, right_id = left_right
                 order = [order_before[0], order_before[1], left_id, right_id]
-    if len(order) != len(after_ids) or set(order) != set(after_ids):
+    if not _same_ids(order, after_ids):
         order = sync_window_order(
             state, after_ids, new_ids=new_ids, previous_ids=before_ids
         )
     # Normalize when the layout shape or slot ordering is off; avoid extra work otherwise.
-    layout_ok = layout_shape_matches(tab, len(after_ids))
-    geometry_ok = geometry_ready(tab, order) and order_matches_geometry(tab, order)
-    # Enforce minimum pane sizes to prevent tiny panes from lingering.
-    size_ok = pane_sizes_ok(tab, after_ids)
-    if not layout_ok or not geometry_ok or not size_ok:
+    # Checks run cheapest first and stop at the first failure.
+    needs_normalize = (
+        not layout_shape_matches(tab, len(after_ids))
+        # order_matches_geometry is False whenever geometry is not ready yet.
+        or not order_matches_geometry(tab, order)
+        # Enforce minimum pane sizes to prevent tiny panes from lingering.
+        or not pane_sizes_ok(tab, after_ids)
+    )
+    if needs_normalize:
         _wait_for_group_ids(tab, after_ids)
         order = normalize_layout(tab, order)
         canonical_after = canonical_order_from_pairs(tab, after_ids)
@@ -561,11 +699,8 @@ def handle_result(
             # Refresh state with the canonical slot order post-normalization.
             order = canonical_after
     else:
-        try:
-            tab.reset_window_sizes()
-        except Exception:
-            pass
-    state["order"] = order
+        reset_window_sizes(tab)
+    state.order = order
 
-    # Force an immediate repaint after split creation on Hyprland/Wayland.
-    split_repaint_focus_bounce()
+    # Force a repaint after split creation on Hyprland/Wayland without blocking kitty.
+    split_repaint_focus_bounce_async()
@@ -7,74 +7,219 @@ transient right/bottom clipping observed on Hyprland with kitty in Wayland mode.
 
 from __future__ import annotations
 
+import atexit
+import functools
+import json
 import os
+import socket
 import subprocess
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 from kitty.constants import is_wayland
 
 _HYPRLAND_WAYLAND_SPLIT_WORKAROUND_ENV = "KITTY_HYPRLAND_WAYLAND_SPLIT_WORKAROUND"
 _HYPRLAND_WAYLAND_SPLIT_DEBUG_ENV = "KITTY_HYPRLAND_WAYLAND_SPLIT_DEBUG"
+_HYPRLAND_SOCKET_TIMEOUT = 0.5
+# Bounds the hyprctl fallback so a stuck binary cannot block kitty or its exit.
+_HYPRCTL_TIMEOUT = 1.0
 
+_TRUTHY_SETTINGS = frozenset({"1", "true", "yes", "on"})
+_FALSY_SETTINGS = frozenset({"0", "false", "no", "off"})
 
+# kitty's environment is fixed for the life of the process, so read it once.
+_WORKAROUND_ENABLED = (
+    os.environ.get(_HYPRLAND_WAYLAND_SPLIT_WORKAROUND_ENV, "1").strip().lower()
+    not in _FALSY_SETTINGS
+)
+_DEBUG_ENABLED = (
+    os.environ.get(_HYPRLAND_WAYLAND_SPLIT_DEBUG_ENV, "0").strip().lower()
+    in _TRUTHY_SETTINGS
+)
+_RUNTIME_DIR = os.environ.get("XDG_RUNTIME_DIR")
+
+_JSON_DECODER = json.JSONDecoder()
+
+_hyprland_socket_path: str | None = None
+_log_fd: int | None = None
+# Guards the lazy log open and the timestamp cache; the bounce worker logs too.
+_log_lock = threading.Lock()
+_log_stamp: tuple[int, str] = (-1, "")
+_bounce_pool: ThreadPoolExecutor | None = None
+# Serializes bounces so the worker and the synchronous close path never interleave.
+_bounce_lock = threading.Lock()
+
+
+@functools.cache
 def _is_hyprland_wayland() -> bool:
+    # Cached on first use rather than at import so kitty's backend is settled.
     return is_wayland() and bool(os.environ.get("HYPRLAND_INSTANCE_SIGNATURE"))
 
 
-def _split_repaint_log(message: str) -> None:
-    if os.environ.get(_HYPRLAND_WAYLAND_SPLIT_DEBUG_ENV, "0").strip().lower() not in (
-        "1",
-        "true",
-        "yes",
-        "on",
-    ):
-        return
+def _log_timestamp() -> str:
+    """Return the log timestamp, formatting it only when the second changes."""
+    global _log_stamp
+    now = int(time.time())
+    if now != _log_stamp[0]:
+        _log_stamp = (now, time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now)))
+    return _log_stamp[1]
+
 
-    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
-    if not runtime_dir:
+def _split_repaint_log(message: str) -> None:
+    global _log_fd
+    if not _DEBUG_ENABLED or not _RUNTIME_DIR:
         return
 
     try:
-        with open(
-            os.path.join(runtime_dir, "kitty-hyprland-split-workaround.log"),
-            "a",
-            encoding="utf-8",
-        ) as f:
-            f.write(f"{time.strftime('%Y-%m-%d %H:%M:%S')} {message}\n")
+        with _log_lock:
+            if _log_fd is None:
+                # Keep the log open for the life of kitty instead of reopening per line;
+                # an unbuffered append descriptor needs no flush.
+                _log_fd = os.open(
+                    os.path.join(_RUNTIME_DIR, "kitty-hyprland-split-workaround.log"),
+                    os.O_WRONLY | os.O_CREAT | os.O_APPEND,
+                    0o666,
+                )
+                atexit.register(os.close, _log_fd)
+            os.write(_log_fd, f"{_log_timestamp()} {message}\n".encode())
     except Exception:
         return
 
 
+def _hyprland_socket() -> str | None:
+    """
+    Return the path of Hyprland's command socket, or None when it cannot be found.
+
+    Hyprland 0.40+ keeps it under $XDG_RUNTIME_DIR/hypr; older releases used /tmp/hypr.
+    The lookup runs once per process; a miss is cached as "" so later calls go
+    straight to the hyprctl fallback.
+    """
+    global _hyprland_socket_path
+    if _hyprland_socket_path is None:
+        _hyprland_socket_path = ""
+        signature = os.environ.get("HYPRLAND_INSTANCE_SIGNATURE")
+        if signature:
+            bases = [os.path.join(_RUNTIME_DIR, "hypr")] if _RUNTIME_DIR else []
+            bases.append("/tmp/hypr")
+            for base in bases:
+                path = os.path.join(base, signature, ".socket.sock")
+                if os.path.exists(path):
+                    _hyprland_socket_path = path
+                    break
+    return _hyprland_socket_path or None
+
+
+def _hyprland_request(request: str) -> bytes | None:
+    """
+    Send one request over Hyprland's command socket and return the raw reply.
+
+    The request uses hyprctl's wire format (`flags/command args`). None is returned
+    when the socket cannot be reached so callers can fall back to the hyprctl binary.
+    """
+    path = _hyprland_socket()
+    if path is None:
+        return None
+    try:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    except OSError:
+        return None
+    with sock:
+        sock.settimeout(_HYPRLAND_SOCKET_TIMEOUT)
+        reply = bytearray()
+        try:
+            sock.connect(path)
+            sock.sendall(request.encode())
+            while chunk := sock.recv(8192):
+                reply += chunk
+        except OSError:
+            # Includes timeouts and resets while Hyprland restarts; use hyprctl instead.
+            return None
+    return bytes(reply)
+
+
 def _hyprctl_json(*args: str) -> dict:
     """
     Return hyprctl JSON output as a dict.
 
     This is used to read the active window address and enumerate candidates on
-    the same workspace.
+    the same workspace. The command socket is used directly when reachable.
     """
+    reply = _hyprland_request(f"j/{' '.join(args)}")
+    if reply is not None:
+        return json.loads(reply)
+    # Keep stdout as bytes; json.loads decodes UTF-8 itself, avoiding a str copy.
     proc = subprocess.run(
         ["hyprctl", "-j", *args],
         check=False,
+        timeout=_HYPRCTL_TIMEOUT,
         stdout=subprocess.PIPE,
         stderr=subprocess.PIPE,
-        text=True,
     )
     if proc.returncode != 0:
-        raise RuntimeError(proc.stderr.strip() or f"hyprctl -j {' '.join(args)} failed")
-    import json
-
+        raise RuntimeError(
+            proc.stderr.decode(errors="replace").strip()
+            or f"hyprctl -j {' '.join(args)} failed"
+        )
     return json.loads(proc.stdout)
 
 
+def _hyprctl_json_batch(*commands: str) -> list:
+    """
+    Return the JSON replies of several queries sent as one batched request.
+
+    Hyprland concatenates the batched replies, so they are decoded one value at a
+    time; a short reply list is reported as an error.
+    """
+    reply = _hyprland_request(f"[[BATCH]]{';'.join(f'j/{c}' for c in commands)}")
+    if reply is None:
+        proc = subprocess.run(
+            ["hyprctl", "-j", "--batch", " ; ".join(commands)],
+            check=False,
+            timeout=_HYPRCTL_TIMEOUT,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(
+                proc.stderr.strip() or f"hyprctl -j --batch {commands!r} failed"
+            )
+        text = proc.stdout
+    else:
+        text = reply.decode()
+    values = []
+    position = 0
+    text = text.strip()
+    while position < len(text):
+        value, position = _JSON_DECODER.raw_decode(text, position)
+        values.append(value)
+        while position < len(text) and text[position].isspace():
+            position += 1
+    if len(values) != len(commands):
+        raise RuntimeError(f"hyprctl -j --batch {commands!r}: {len(values)} replies")
+    return values
+
+
 def _hyprctl_dispatch(*args: str) -> None:
     """
     Run a hyprctl dispatcher command.
 
     Dispatchers are scoped to focus transitions and the renderer reload fallback.
+    The command socket is used directly when reachable.
     """
+    reply = _hyprland_request(f"/dispatch {' '.join(args)}")
+    if reply is not None:
+        if reply.strip() != b"ok":
+            raise RuntimeError(
+                reply.decode(errors="replace").strip()
+                or f"hyprctl dispatch {' '.join(args)} failed"
+            )
+        return
     proc = subprocess.run(
         ["hyprctl", "dispatch", *args],
         check=False,
+        timeout=_HYPRCTL_TIMEOUT,
         stdout=subprocess.DEVNULL,
         stderr=subprocess.PIPE,
         text=True,
@@ -85,24 +230,65 @@ def _hyprctl_dispatch(*args: str) -> None:
         )
 
 
+def _hyprctl_dispatch_batch(*dispatches: tuple[str, ...]) -> None:
+    """
+    Run several dispatcher commands in a single batched request.
+
+    Each dispatch is a tuple of dispatcher arguments, as for `_hyprctl_dispatch`.
+    Batching keeps a focus bounce to one round-trip instead of one per dispatcher.
+    """
+    batch = " ; ".join(f"dispatch {' '.join(args)}" for args in dispatches)
+    reply = _hyprland_request(f"[[BATCH]]{batch}")
+    if reply is not None:
+        # Hyprland answers each batched command in turn; anything but "ok" is an error.
+        if reply.replace(b"ok", b"").strip():
+            raise RuntimeError(
+                reply.decode(errors="replace").strip()
+                or f"hyprctl --batch {batch!r} failed"
+            )
+        return
+    proc = subprocess.run(
+        ["hyprctl", "--batch", batch],
+        check=False,
+        timeout=_HYPRCTL_TIMEOUT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip() or f"hyprctl --batch {batch!r} failed")
+
+
+def split_repaint_bounce_needed() -> bool:
+    """
+    Return True when the repaint workaround is enabled and kitty runs on Hyprland.
+
+    Callers use this to skip the bounce and its follow-up focus handling entirely
+    on other compositors and on X11.
+    """
+    return _WORKAROUND_ENABLED and _is_hyprland_wayland()
+
+
 def split_repaint_focus_bounce() -> None:
     """
     Trigger a compositor repaint after split creation on Hyprland/Wayland.
 
     A focus bounce within the same workspace is preferred; monitor bounce and
-    renderer reload are used as fallbacks.
+    renderer reload are used as fallbacks. Bounces hold a lock so one queued on the
+    background worker and one run synchronously cannot interleave their dispatches.
     """
-    setting = (
-        os.environ.get(_HYPRLAND_WAYLAND_SPLIT_WORKAROUND_ENV, "1").strip().lower()
-    )
-    if setting in ("0", "false", "no", "off"):
+    if not split_repaint_bounce_needed():
         return
+    with _bounce_lock:
+        _focus_bounce()
 
-    if not _is_hyprland_wayland():
-        return
 
+def _focus_bounce() -> None:
+    """Run one repaint bounce; callers hold `_bounce_lock`."""
     try:
-        active = _hyprctl_json("activewindow")
+        active, active_workspace = _hyprctl_json_batch(
+            "activewindow", "activeworkspace"
+        )
         address = active.get("address")
         workspace = active.get("workspace") or {}
         workspace_id = workspace.get("id")
@@ -110,12 +296,22 @@ def split_repaint_focus_bounce() -> None:
             _split_repaint_log("skip: activewindow missing address")
             return
 
+        # A workspace holding only the active window cannot offer a bounce target,
+        # and a monitor bounce has nothing to refocus there, so only the renderer
+        # reload is issued.
+        lone_window = (
+            isinstance(active_workspace, dict)
+            and active_workspace.get("id") == workspace_id
+            and active_workspace.get("windows", 2) <= 1
+        )
+
         # Prefer focusing another window on the same workspace to avoid
         # workspace-switch animations.
         candidate_address: str | None = None
-        if isinstance(workspace_id, int):
+        if isinstance(workspace_id, int) and not lone_window:
             clients = _hyprctl_json("clients")
-            candidates: list[tuple[int, str]] = []
+            # Track the most recently focused candidate (lowest history id) in one pass.
+            best_hid: int | None = None
             for c in clients:
                 try:
                     if not c.get("mapped", True) or c.get("hidden", False):
@@ -126,29 +322,56 @@ def split_repaint_focus_bounce() -> None:
                     if not addr or addr == address:
                         continue
                     hid = int(c.get("focusHistoryID", 10**9))
-                    candidates.append((hid, addr))
-                except Exception:
+                    if best_hid is None or hid < best_hid:
+                        best_hid = hid
+                        candidate_address = addr
+                except (AttributeError, TypeError, ValueError):
+                    # Skip malformed client entries (non-dicts, bad history ids).
                     continue
-            if candidates:
-                candidates.sort(key=lambda x: x[0])
-                candidate_address = candidates[0][1]
 
         if candidate_address:
-            _hyprctl_dispatch("focuswindow", f"address:{candidate_address}")
-            _hyprctl_dispatch("focuswindow", f"address:{address}")
+            _hyprctl_dispatch_batch(
+                ("focuswindow", f"address:{candidate_address}"),
+                ("focuswindow", f"address:{address}"),
+            )
             _split_repaint_log(
                 f"ok: focus_bounce address={address} via={candidate_address}"
             )
         else:
-            try:
-                _hyprctl_dispatch("focusmonitor", "current")
-                _hyprctl_dispatch("focuswindow", f"address:{address}")
-                _split_repaint_log(f"ok: focusmonitor_bounce address={address}")
-            except Exception as e:
-                _split_repaint_log(f"warn: focusmonitor_bounce failed: {e!s}")
+            if not lone_window:
+                try:
+                    _hyprctl_dispatch_batch(
+                        ("focusmonitor", "current"),
+                        ("focuswindow", f"address:{address}"),
+                    )
+                    _split_repaint_log(f"ok: focusmonitor_bounce address={address}")
+                except Exception as e:
+                    _split_repaint_log(f"warn: focusmonitor_bounce failed: {e!s}")
 
             _hyprctl_dispatch("forcerendererreload")
             _split_repaint_log(f"ok: forcerendererreload address={address}")
     except Exception as e:
         _split_repaint_log(f"error: {e!s}")
         return
+
+
+def split_repaint_focus_bounce_async() -> None:
+    """
+    Queue the repaint bounce on a background worker and return immediately.
+
+    The bounce only talks to Hyprland, so it can run off kitty's main thread; a
+    single worker keeps bounces in submission order, and the bounce lock keeps them
+    apart from synchronous bounces. Callers that re-assert focus after the bounce
+    must use the synchronous form instead.
+    """
+    global _bounce_pool
+    if not split_repaint_bounce_needed():
+        return
+    try:
+        if _bounce_pool is None:
+            _bounce_pool = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="smart-split-bounce"
+            )
+        _bounce_pool.submit(split_repaint_focus_bounce)
+    except Exception as e:
+        _split_repaint_log(f"error: bounce submit failed: {e!s}")
@@ -7,36 +7,65 @@ entrypoint can focus on flow control and layout rules.
 
 from __future__ import annotations
 
+from collections.abc import Callable
+from typing import Any
+
 from kitty.typing_compat import BossType
 
+_ACCESSOR_CACHE_ATTR = "_smart_split_accessors"
+
+
+def _resolve_accessor(boss: BossType, name: str) -> Callable[[], Any]:
+    """
+    Return a zero-argument getter for `boss.<name>`.
+
+    Kitty exposes some boss members as properties and others as methods depending on
+    the version; the form is resolved once so later calls skip the probing.
+    """
+    descriptor = getattr(type(boss), name, None)
+    if isinstance(descriptor, property) and descriptor.fget is not None:
+        fget = descriptor.fget
+        return lambda: fget(boss)
+    attr = getattr(boss, name, None)
+    if callable(attr):
+        return attr
+    return lambda: getattr(boss, name, None)
+
+
+def _boss_accessor(boss: BossType, name: str) -> Callable[[], Any]:
+    """Return the cached getter for `boss.<name>`, resolving it on first use."""
+    cache = getattr(boss, _ACCESSOR_CACHE_ATTR, None)
+    if cache is None:
+        cache = {}
+        setattr(boss, _ACCESSOR_CACHE_ATTR, cache)
+    getter = cache.get(name)
+    if getter is None:
+        getter = _resolve_accessor(boss, name)
+        cache[name] = getter
+    return getter
+
 
 def active_tab_manager(boss: BossType):
     """Return the active tab manager, handling callable or attribute forms."""
-    attr = getattr(boss, "active_tab_manager", None)
-    if callable(attr):
-        try:
-            return attr()
-        except Exception:
-            return None
-    return attr
+    try:
+        return _boss_accessor(boss, "active_tab_manager")()
+    except Exception:
+        return None
 
 
 def active_tab(boss: BossType):
     """Return the active tab, handling callable or attribute forms."""
-    attr = getattr(boss, "active_tab", None)
-    if callable(attr):
-        try:
-            return attr()
-        except Exception:
-            return None
-    return attr
+    try:
+        return _boss_accessor(boss, "active_tab")()
+    except Exception:
+        return None
 
 
 def window_count(tab) -> int:
     """Return the current window count for the tab, defaulting to 0 on errors."""
     try:
         return len(tab.windows)
-    except Exception:
+    except (AttributeError, TypeError):
         return 0
 
 
@@ -60,6 +89,14 @@ def tab_window_ids(tab) -> list[int]:
         return []
 
 
+def active_window_id(tab) -> int | None:
+    """Return the id of the tab's active window, or None when there is none."""
+    try:
+        return tab.active_window.id
+    except AttributeError:
+        return None
+
+
 def active_window_neighbors(tab) -> dict:
     """
     Return neighbor metadata for the active window, if the layout exposes it.
@@ -67,15 +104,14 @@ def active_window_neighbors(tab) -> dict:
     Neighbor metadata can be absent on some kitty versions or layouts.
     """
     try:
-        active_window = getattr(tab, "active_window", None)
-        active_window_id = getattr(active_window, "id", None)
-        if active_window_id is None:
+        window_id = active_window_id(tab)
+        if window_id is None:
             return {}
         list_windows = getattr(tab, "list_windows", None)
         if not callable(list_windows):
             return {}
         for window_info in list_windows():
-            if window_info.get("id") == active_window_id:
+            if window_info.get("id") == window_id:
                 return window_info.get("neighbors") or {}
     except Exception:
         return {}
@@ -105,6 +141,38 @@ def close_active_window(boss: BossType, target_window_id: int) -> None:
         return
 
 
+def focus_window(tab, window_id: int) -> None:
+    """Make `window_id` the active window of `tab`, ignoring stale ids."""
+    try:
+        tab.set_active_window(window_id)
+    except Exception:
+        return
+
+
+def move_window_to_edge(boss: BossType, tab, window_id: int, edge: str) -> bool:
+    """
+    Focus `window_id` and move it to a screen edge of the splits layout.
+
+    Returns False when either step fails so callers can skip follow-up work.
+    """
+    try:
+        tab.set_active_window(window_id)
+        boss.call_remote_control(
+            None, ("action", "layout_action", "move_to_screen_edge", edge)
+        )
+    except Exception:
+        return False
+    return True
+
+
+def reset_window_sizes(tab) -> None:
+    """Reset window sizes to the layout defaults, ignoring failures."""
+    try:
+        tab.reset_window_sizes()
+    except Exception:
+        return
+
+
 def window_group_id(tab, window_id: int) -> int | None:
     """
     Return the window group id for the splits layout tree, when available.
@@ -112,10 +180,34 @@ def window_group_id(tab, window_id: int) -> int | None:
     Group ids provide stable references for layout serialization.
     """
     try:
-        window = tab.windows.id_map.get(window_id)
+        windows = tab.windows
+        window = windows.id_map.get(window_id)
         if window is None:
             return None
-        group = tab.windows.group_for_window(window)
+        group = windows.group_for_window(window)
         return group.id if group is not None else None
     except Exception:
         return None
+
+
+def window_group_ids(tab, window_ids: list[int]) -> list[int] | None:
+    """
+    Return the group ids for `window_ids` in order, or None if any is unavailable.
+
+    The tab's window list is resolved once for the whole batch.
+    """
+    try:
+        windows = tab.windows
+        id_map = windows.id_map
+        group_ids: list[int] = []
+        for wid in window_ids:
+            window = id_map.get(wid)
+            if window is None:
+                return None
+            group = windows.group_for_window(window)
+            if group is None:
+                return None
+            group_ids.append(group.id)
+    except Exception:
+        return None
+    return group_ids
@@ -7,11 +7,17 @@ active pane already has both horizontal and vertical adjacency.
 
 from __future__ import annotations
 
+import functools
 import os
 
 from kitty.layout.base import lgd
 
-from smart_split_kitty import active_window_neighbors, window_group_id
+from smart_split_kitty import (
+    active_window_neighbors,
+    reset_window_sizes,
+    window_group_id,
+    window_group_ids,
+)
 
 _MIN_COLS_ENV = "KITTY_SMART_SPLIT_MIN_COLS"
 _MIN_ROWS_ENV = "KITTY_SMART_SPLIT_MIN_ROWS"
@@ -23,13 +29,21 @@ try:
 except Exception:  # pragma: no cover - kitty layout internals can vary by version.
     Pair = None
 
+# The Splits layout class, remembered after the first name match.
+_splits_type: type | None = None
 
-def _reset_window_sizes(tab) -> None:
-    """Reset window sizes to the layout defaults, ignoring failures."""
-    try:
-        tab.reset_window_sizes()
-    except Exception:
-        return
+
+def _splits_layout(tab):
+    """Return the tab's current layout when it is the splits layout, else None."""
+    global _splits_type
+    layout = getattr(tab, "current_layout", None)
+    layout_type = type(layout)
+    if layout_type is _splits_type:
+        return layout
+    if layout is not None and layout_type.__name__ == "Splits":
+        _splits_type = layout_type
+        return layout
+    return None
 
 
 def _apply_pairs_root(tab, pairs_root) -> bool:
@@ -38,8 +52,8 @@ def _apply_pairs_root(tab, pairs_root) -> bool:
 
     Direct assignment avoids layout.unserialize side effects that can reorder groups.
     """
-    layout = getattr(tab, "current_layout", None)
-    if layout is None or layout.__class__.__name__ != "Splits":
+    layout = _splits_layout(tab)
+    if layout is None:
         return False
     try:
         layout.pairs_root = pairs_root
@@ -81,10 +95,40 @@ def _build_pairs_root(group_ids: list[int]) -> object | None:
     return None
 
 
+def _build_pairs_dict(group_ids: list[int]) -> dict:
+    """
+    Build the serialized pairs dict for canonical layouts based on group ids.
+
+    Only the unserialize fallback needs this form, so it is built on demand.
+    """
+    if len(group_ids) == 2:
+        return {
+            "horizontal": True,
+            "one": group_ids[0],
+            "two": group_ids[1],
+        }
+    top = {
+        "horizontal": True,
+        "one": group_ids[0],
+        "two": group_ids[1],
+    }
+    if len(group_ids) == 3:
+        return {"horizontal": False, "one": top, "two": group_ids[2]}
+    return {
+        "horizontal": False,
+        "one": top,
+        "two": {
+            "horizontal": True,
+            "one": group_ids[2],
+            "two": group_ids[3],
+        },
+    }
+
+
 def _layout_pairs(tab) -> dict | None:
     """Return the serialized layout pairs for splits, or None if unavailable."""
-    layout = getattr(tab, "current_layout", None)
-    if layout is None or layout.__class__.__name__ != "Splits":
+    layout = _splits_layout(tab)
+    if layout is None:
         return None
     try:
         state = layout.serialize(tab.windows)
@@ -93,18 +137,6 @@ def _layout_pairs(tab) -> dict | None:
     return state.get("pairs")
 
 
-def _collect_pair_leaves(node: object) -> list[int]:
-    """Return all leaf ids from a serialized pairs tree."""
-    if isinstance(node, dict):
-        leaves: list[int] = []
-        leaves.extend(_collect_pair_leaves(node.get("one")))
-        leaves.extend(_collect_pair_leaves(node.get("two")))
-        return leaves
-    if isinstance(node, int):
-        return [node]
-    return []
-
-
 def layout_shape_matches(tab, count: int) -> bool:
     """
     Return True when the serialized splits tree matches the canonical shape.
@@ -117,61 +149,83 @@ def layout_shape_matches(tab, count: int) -> bool:
     """
     if count <= 1:
         return True
-    pairs = _layout_pairs(tab)
-    if not isinstance(pairs, dict):
-        return False
-    leaves = _collect_pair_leaves(pairs)
-    if len(leaves) != count:
-        return False
+    return _pairs_match_shape(_layout_pairs(tab), count)
 
-    def is_pair(node: object) -> bool:
-        return isinstance(node, dict)
 
-    def is_leaf(node: object) -> bool:
-        return isinstance(node, int)
+def _shape_matches_2(pairs: dict) -> bool:
+    """Return True for left/right columns: a horizontal pair of two leaves."""
+    return (
+        pairs.get("horizontal", True)
+        and isinstance(pairs.get("one"), int)
+        and isinstance(pairs.get("two"), int)
+    )
 
-    def horizontal_flag(node: dict) -> bool:
-        return node.get("horizontal", True)
 
-    if count == 2:
-        return (
-            horizontal_flag(pairs)
-            and is_leaf(pairs.get("one"))
-            and is_leaf(pairs.get("two"))
-        )
+def _shape_matches_3(pairs: dict) -> bool:
+    """Return True for a two-pane top row above one full-width bottom leaf."""
+    top = pairs.get("one")
+    return (
+        not pairs.get("horizontal", True)
+        and isinstance(top, dict)
+        and isinstance(pairs.get("two"), int)
+        and top.get("horizontal", True)
+        and isinstance(top.get("one"), int)
+        and isinstance(top.get("two"), int)
+    )
 
-    if count == 3:
-        return (
-            not horizontal_flag(pairs)
-            and is_pair(pairs.get("one"))
-            and is_leaf(pairs.get("two"))
-            and horizontal_flag(pairs["one"])
-            and is_leaf(pairs["one"].get("one"))
-            and is_leaf(pairs["one"].get("two"))
-        )
 
-    if count == 4:
-        return (
-            not horizontal_flag(pairs)
-            and is_pair(pairs.get("one"))
-            and is_pair(pairs.get("two"))
-            and horizontal_flag(pairs["one"])
-            and horizontal_flag(pairs["two"])
-            and is_leaf(pairs["one"].get("one"))
-            and is_leaf(pairs["one"].get("two"))
-            and is_leaf(pairs["two"].get("one"))
-            and is_leaf(pairs["two"].get("two"))
-        )
+def _shape_matches_4(pairs: dict) -> bool:
+    """Return True for a 2x2 grid: a vertical pair of two horizontal leaf pairs."""
+    top = pairs.get("one")
+    bottom = pairs.get("two")
+    return (
+        not pairs.get("horizontal", True)
+        and isinstance(top, dict)
+        and isinstance(bottom, dict)
+        and top.get("horizontal", True)
+        and bottom.get("horizontal", True)
+        and isinstance(top.get("one"), int)
+        and isinstance(top.get("two"), int)
+        and isinstance(bottom.get("one"), int)
+        and isinstance(bottom.get("two"), int)
+    )
+
+
+# Each validator requires every slot to be a leaf, which also pins the leaf count,
+# so a tree is validated in a single structural pass.
+_SHAPE_VALIDATORS = {2: _shape_matches_2, 3: _shape_matches_3, 4: _shape_matches_4}
+
+
+def _pairs_match_shape(pairs: object, count: int) -> bool:
+    """
+    Return True when an already serialized pairs tree has the canonical shape.
+
+    Callers holding the pairs use this directly to avoid serializing the layout twice.
+    """
+    if not isinstance(pairs, dict):
+        return False
+    validator = _SHAPE_VALIDATORS.get(count)
+    return validator is not None and bool(validator(pairs))
 
-    return False
+
+def _pairs_leaves(pairs: object) -> list:
+    """Return the leaves of a serialized pairs tree in slot (depth-first) order."""
+    leaves = []
+    stack = [pairs]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            # Push "two" first so "one" is visited first, keeping slot order.
+            stack.append(node.get("two"))
+            stack.append(node.get("one"))
+        else:
+            leaves.append(node)
+    return leaves
 
 
 def group_ids_ready(tab, window_ids: list[int]) -> bool:
     """Return True when all window group ids are available."""
-    for wid in window_ids:
-        if window_group_id(tab, wid) is None:
-            return False
-    return True
+    return window_group_ids(tab, window_ids) is not None
 
 
 def canonical_order_from_pairs(tab, window_ids: list[int]) -> list[int] | None:
@@ -187,17 +241,13 @@ def canonical_order_from_pairs(tab, window_ids: list[int]) -> list[int] | None:
     if count < 2 or count > 4:
         return None
     pairs = _layout_pairs(tab)
-    if not isinstance(pairs, dict):
-        return None
-    if not layout_shape_matches(tab, count):
+    if not _pairs_match_shape(pairs, count):
         return None
 
-    group_to_window: dict[int, int] = {}
-    for wid in window_ids:
-        gid = window_group_id(tab, wid)
-        if gid is None:
-            return None
-        group_to_window[gid] = wid
+    group_ids = window_group_ids(tab, window_ids)
+    if group_ids is None:
+        return None
+    group_to_window = dict(zip(group_ids, window_ids))
 
     def map_gid(gid: int | None) -> int | None:
         if gid is None:
@@ -252,17 +302,20 @@ def _pairs_has_both_axes(
     A leaf is considered square when its path includes a left/right split and a
     top/bottom split in any order.
     """
-    if isinstance(pairs, dict):
-        # "horizontal" defaults to True when absent in the serialized layout.
-        horizontal = pairs.get("horizontal", True)
-        next_has_horizontal = has_horizontal or horizontal
-        next_has_vertical = has_vertical or not horizontal
-        return _pairs_has_both_axes(
-            pairs.get("one"), target_gid, next_has_horizontal, next_has_vertical
-        ) or _pairs_has_both_axes(
-            pairs.get("two"), target_gid, next_has_horizontal, next_has_vertical
-        )
-    return pairs == target_gid and has_horizontal and has_vertical
+    stack = [(pairs, has_horizontal, has_vertical)]
+    while stack:
+        node, path_horizontal, path_vertical = stack.pop()
+        if isinstance(node, dict):
+            # "horizontal" defaults to True when absent in the serialized layout.
+            horizontal = node.get("horizontal", True)
+            next_horizontal = path_horizontal or horizontal
+            next_vertical = path_vertical or not horizontal
+            # Push "two" first so "one" is visited first, as in a recursive walk.
+            stack.append((node.get("two"), next_horizontal, next_vertical))
+            stack.append((node.get("one"), next_horizontal, next_vertical))
+        elif node == target_gid and path_horizontal and path_vertical:
+            return True
+    return False
 
 
 def _neighbor_present(value: object) -> bool:
@@ -273,36 +326,35 @@ def _neighbor_present(value: object) -> bool:
 
 def _neighbors_have_both_axes(neighbors: dict) -> bool:
     """Return True when neighbor metadata indicates both axes are occupied."""
-    horizontal = _neighbor_present(neighbors.get("left")) or _neighbor_present(
-        neighbors.get("right")
+    # The vertical axis is only inspected once the horizontal one is occupied.
+    return (
+        _neighbor_present(neighbors.get("left"))
+        or _neighbor_present(neighbors.get("right"))
+    ) and (
+        _neighbor_present(neighbors.get("top"))
+        or _neighbor_present(neighbors.get("bottom"))
     )
-    vertical = _neighbor_present(neighbors.get("top")) or _neighbor_present(
-        neighbors.get("bottom")
-    )
-    return horizontal and vertical
 
 
-def _window_geometry(tab, window_id: int):
+def _window_geometries(tab, window_ids: list[int]) -> list | None:
     """
-    Return the window geometry for a given window id.
+    Return valid geometries for `window_ids` in order, or None if any is unavailable.
 
-    Geometry is read from the window object and can be unavailable during relayout.
+    Geometry is read from the window objects and can be unavailable during relayout;
+    the tab's window map is resolved once for the whole batch.
     """
+    geometries = []
     try:
-        window = tab.windows.id_map.get(window_id)
-        if window is None:
-            return None
-        return getattr(window, "geometry", None)
+        id_map = tab.windows.id_map
+        for wid in window_ids:
+            # A missing window has no geometry; malformed rectangles raise below.
+            geom = getattr(id_map.get(wid), "geometry", None)
+            if geom is None or geom.right <= geom.left or geom.bottom <= geom.top:
+                return None
+            geometries.append(geom)
     except Exception:
         return None
-
-
-def _geometry_valid(geom) -> bool:
-    """Return True when geometry has non-zero width and height."""
-    try:
-        return (geom.right - geom.left) > 0 and (geom.bottom - geom.top) > 0
-    except Exception:
-        return False
+    return geometries
 
 
 def _center_y(geom) -> float:
@@ -310,11 +362,6 @@ def _center_y(geom) -> float:
     return (geom.top + geom.bottom) / 2.0
 
 
-def _stable_index_map(order: list[int]) -> dict[int, int]:
-    """Return a stable index map used as a tie-breaker in geometry sorting."""
-    return {wid: idx for idx, wid in enumerate(order)}
-
-
 def _reorder_by_geometry(tab, order: list[int]) -> list[int]:
     """
     Return a geometry-based ordering to keep normalized layouts predictable.
@@ -326,52 +373,55 @@ def _reorder_by_geometry(tab, order: list[int]) -> list[int]:
     if count < 2 or count > 4:
         return order
 
-    geometry_map = {}
-    for wid in order:
-        geom = _window_geometry(tab, wid)
-        if geom is None or not _geometry_valid(geom):
-            return order
-        geometry_map[wid] = geom
+    geometries = _window_geometries(tab, order)
+    if geometries is None:
+        return order
+    return _order_from_geometries(order, geometries)
+
 
-    stable_index = _stable_index_map(order)
+def _order_from_geometries(order: list[int], geometries: list) -> list[int]:
+    """
+    Return `order` rearranged by the matching valid geometries.
+
+    The result is always a permutation of `order`, which is returned unchanged when
+    the geometry does not describe a supported layout.
+    """
+    count = len(order)
+    if count < 2 or count > 4:
+        return order
+
+    # Sort keys are built once as tuples; the slot index is the stable tie-breaker and
+    # the trailing id is never compared because slot indexes are unique.
+    row_keys = [
+        (geom.left, idx, wid) for idx, (wid, geom) in enumerate(zip(order, geometries))
+    ]
     epsilon = 0.1
 
     if count == 2:
-        left_values = {wid: geometry_map[wid].left for wid in order}
-        if len(set(left_values.values())) == 1:
+        if row_keys[0][0] == row_keys[1][0]:
             return order
-        return sorted(order, key=lambda wid: (left_values[wid], stable_index[wid]))
+        row_keys.sort()
+        return [key[-1] for key in row_keys]
 
     if count == 3:
-        center_y_map = {wid: _center_y(geometry_map[wid]) for wid in order}
-        max_center_y = max(center_y_map.values())
-        bottom_candidates = [
-            wid for wid in order if abs(center_y_map[wid] - max_center_y) <= epsilon
-        ]
-        bottom = min(
-            bottom_candidates,
-            key=lambda wid: (geometry_map[wid].left, stable_index[wid]),
+        centers = [_center_y(geom) for geom in geometries]
+        max_center_y = max(centers)
+        bottom_key = min(
+            key
+            for key, center in zip(row_keys, centers)
+            if abs(center - max_center_y) <= epsilon
         )
-        top = [wid for wid in order if wid != bottom]
+        top = sorted(key for key in row_keys if key[-1] != bottom_key[-1])
         if len(top) != 2:
             return order
-        top_sorted = sorted(
-            top, key=lambda wid: (geometry_map[wid].left, stable_index[wid])
-        )
-        return top_sorted + [bottom]
+        return [key[-1] for key in top] + [bottom_key[-1]]
 
-    sorted_by_y = sorted(
-        order, key=lambda wid: (_center_y(geometry_map[wid]), stable_index[wid])
-    )
-    top = sorted_by_y[:2]
-    bottom = sorted_by_y[2:]
-    top_sorted = sorted(
-        top, key=lambda wid: (geometry_map[wid].left, stable_index[wid])
+    by_y = sorted(
+        (_center_y(geom), key[1], key) for geom, key in zip(geometries, row_keys)
     )
-    bottom_sorted = sorted(
-        bottom, key=lambda wid: (geometry_map[wid].left, stable_index[wid])
-    )
-    return top_sorted + bottom_sorted
+    top = sorted(key for _, _, key in by_y[:2])
+    bottom = sorted(key for _, _, key in by_y[2:])
+    return [key[-1] for key in top] + [key[-1] for key in bottom]
 
 
 def order_by_geometry(tab, order: list[int]) -> list[int]:
@@ -385,10 +435,15 @@ def order_by_geometry(tab, order: list[int]) -> list[int]:
 
 def geometry_ready(tab, order: list[int]) -> bool:
     """Return True when all window geometries are available and non-zero."""
-    for wid in order:
-        geom = _window_geometry(tab, wid)
-        if geom is None or not _geometry_valid(geom):
-            return False
+    # Same checks as _window_geometries, without collecting the geometries.
+    try:
+        id_map = tab.windows.id_map
+        for wid in order:
+            geom = getattr(id_map.get(wid), "geometry", None)
+            if geom is None or geom.right <= geom.left or geom.bottom <= geom.top:
+                return False
+    except Exception:
+        return False
     return True
 
 
@@ -398,12 +453,11 @@ def order_matches_geometry(tab, order: list[int]) -> bool:
 
     False is returned when geometry is unavailable.
     """
-    if not geometry_ready(tab, order):
-        return False
-    geometry_order = order_by_geometry(tab, order)
-    if len(geometry_order) != len(order) or set(geometry_order) != set(order):
+    geometries = _window_geometries(tab, order)
+    if geometries is None:
         return False
-    return geometry_order == order
+    # The geometry order is a permutation of `order`, so list equality suffices.
+    return _order_from_geometries(order, geometries) == order
 
 
 def three_pane_layout_inverted(tab, window_ids: list[int]) -> bool:
@@ -437,43 +491,51 @@ def three_pane_layout_inverted(tab, window_ids: list[int]) -> bool:
             ):
                 return True
             return False
-    if not geometry_ready(tab, window_ids):
+    geometries = _window_geometries(tab, window_ids)
+    if geometries is None:
         return False
-    geometry_map: dict[int, object] = {}
-    for wid in window_ids:
-        geom = _window_geometry(tab, wid)
-        if geom is None or not _geometry_valid(geom):
-            return False
-        geometry_map[wid] = geom
-    top_values = {wid: geometry_map[wid].top for wid in window_ids}
-    min_top = min(top_values.values())
-    max_top = max(top_values.values())
+    # Read each edge once; the checks below only need these scalars.
+    tops = [geom.top for geom in geometries]
+    min_top = min(tops)
+    max_top = max(tops)
     # Allow slight coordinate drift due to borders and rounding.
     epsilon = max(1, lgd.cell_height // 2)
-    top_row = [wid for wid in window_ids if abs(top_values[wid] - min_top) <= epsilon]
-    bottom_row = [
-        wid for wid in window_ids if abs(top_values[wid] - max_top) <= epsilon
+    top_row = [
+        geom for geom, top in zip(geometries, tops) if abs(top - min_top) <= epsilon
     ]
-    if len(top_row) != 1 or len(bottom_row) != 2:
+    bottom_count = sum(1 for top in tops if abs(top - max_top) <= epsilon)
+    if len(top_row) != 1 or bottom_count != 2:
         return False
-    total_width = max(geometry_map[wid].right for wid in window_ids) - min(
-        geometry_map[wid].left for wid in window_ids
+    total_width = max(geom.right for geom in geometries) - min(
+        geom.left for geom in geometries
     )
-    top_width = geometry_map[top_row[0]].right - geometry_map[top_row[0]].left
+    top_width = top_row[0].right - top_row[0].left
     # Confirm the single top pane spans nearly the full width before treating as inverted.
     return top_width >= int(total_width * 0.9)
 
 
-def _read_min_env(name: str, default: int) -> int:
-    """Return a validated integer from the environment or the provided default."""
+@functools.cache
+def _env_positive_int(name: str) -> int | None:
+    """
+    Return a positive integer from the environment, or None when unset or invalid.
+
+    kitty's environment is fixed for the life of the process, so each name is
+    parsed once; `_env_positive_int.cache_clear()` forces a re-read.
+    """
     value = os.environ.get(name)
     if not value:
-        return default
+        return None
     try:
         parsed = int(value)
     except Exception:
-        return default
-    return parsed if parsed > 0 else default
+        return None
+    return parsed if parsed > 0 else None
+
+
+def _read_min_env(name: str, default: int) -> int:
+    """Return a validated integer from the environment or the provided default."""
+    value = _env_positive_int(name)
+    return default if value is None else value
 
 
 def pane_sizes_ok(
@@ -492,14 +554,12 @@ def pane_sizes_ok(
         return True
     min_cols = _read_min_env(_MIN_COLS_ENV, min_cols or _DEFAULT_MIN_COLS)
     min_rows = _read_min_env(_MIN_ROWS_ENV, min_rows or _DEFAULT_MIN_ROWS)
-    if not geometry_ready(tab, window_ids):
+    geometries = _window_geometries(tab, window_ids)
+    if geometries is None:
         return True
     cell_width = max(1, getattr(lgd, "cell_width", 1))
     cell_height = max(1, getattr(lgd, "cell_height", 1))
-    for wid in window_ids:
-        geom = _window_geometry(tab, wid)
-        if geom is None or not _geometry_valid(geom):
-            return True
+    for geom in geometries:
         cols = max(1, (geom.right - geom.left) // cell_width)
         rows = max(1, (geom.bottom - geom.top) // cell_height)
         if cols < min_cols or rows < min_rows:
@@ -513,12 +573,10 @@ def bottom_row_left_right(tab, first_id: int, second_id: int) -> tuple[int, int]
 
     None is returned when geometry is unavailable or indistinguishable.
     """
-    first_geom = _window_geometry(tab, first_id)
-    second_geom = _window_geometry(tab, second_id)
-    if first_geom is None or second_geom is None:
-        return None
-    if not _geometry_valid(first_geom) or not _geometry_valid(second_geom):
+    geometries = _window_geometries(tab, [first_id, second_id])
+    if geometries is None:
         return None
+    first_geom, second_geom = geometries
     if first_geom.left == second_geom.left:
         return None
     if first_geom.left > second_geom.left:
@@ -530,20 +588,21 @@ def active_window_is_square_slot(tab) -> bool:
     """
     Return True when the active window already has both axes of adjacency.
 
-    The layout tree is preferred for detection, with neighbor metadata as a fallback.
+    The layout's neighbor map is authoritative when it can be read; the pairs tree
+    and listed neighbor metadata are only consulted when that call fails.
     """
     active_window = getattr(tab, "active_window", None)
     active_window_id = getattr(active_window, "id", None)
     if active_window_id is None:
         return False
 
-    layout = getattr(tab, "current_layout", None)
-    if layout is not None and layout.__class__.__name__ == "Splits":
+    layout = _splits_layout(tab)
+    if layout is not None:
         try:
-            # Prefer the layout-provided neighbor map for accurate adjacency.
+            # Prefer the layout-provided neighbor map for accurate adjacency; a
+            # successful answer, square or not, makes the tree walk unnecessary.
             neighbors = layout.neighbors_for_window(active_window, tab.windows)
-            if _neighbors_have_both_axes(neighbors):
-                return True
+            return _neighbors_have_both_axes(neighbors)
         except Exception:
             pass
 
@@ -573,63 +632,40 @@ def normalize_layout(tab, order: list[int]) -> list[int]:
     """
     count = len(order)
     if count <= 1:
-        _reset_window_sizes(tab)
+        reset_window_sizes(tab)
         return order
     if count > 4:
         return order
-    layout = getattr(tab, "current_layout", None)
-    if layout is None or layout.__class__.__name__ != "Splits":
+    layout = _splits_layout(tab)
+    if layout is None:
         return order
 
-    group_ids: list[int] = []
-    for wid in order:
-        gid = window_group_id(tab, wid)
-        if gid is not None:
-            group_ids.append(gid)
-    if len(group_ids) != count:
+    group_ids = window_group_ids(tab, order)
+    if group_ids is None:
+        return order
+
+    current_pairs = _layout_pairs(tab)
+    if (
+        _pairs_match_shape(current_pairs, count)
+        and _pairs_leaves(current_pairs) == group_ids
+    ):
+        # The tree already has the canonical shape in this order; skip the rebuild
+        # and relayout and only even out the pane sizes.
+        reset_window_sizes(tab)
         return order
 
     pairs_root = _build_pairs_root(group_ids)
     if pairs_root is not None and _apply_pairs_root(tab, pairs_root):
-        _reset_window_sizes(tab)
+        reset_window_sizes(tab)
         return order
 
-    if count == 2:
-        pairs = {
-            "horizontal": True,
-            "one": group_ids[0],
-            "two": group_ids[1],
-        }
-    elif count == 3:
-        pairs = {
-            "horizontal": False,
-            "one": {
-                "horizontal": True,
-                "one": group_ids[0],
-                "two": group_ids[1],
-            },
-            "two": group_ids[2],
-        }
-    else:
-        pairs = {
-            "horizontal": False,
-            "one": {
-                "horizontal": True,
-                "one": group_ids[0],
-                "two": group_ids[1],
-            },
-            "two": {
-                "horizontal": True,
-                "one": group_ids[2],
-                "two": group_ids[3],
-            },
-        }
-
+    # Fall back to unserialize when the Pair tree cannot be built or applied.
+    pairs = _build_pairs_dict(group_ids)
     try:
         state = layout.serialize(tab.windows)
         state["pairs"] = pairs
         layout.unserialize(state, tab.windows)
     except Exception:
         return order
-    _reset_window_sizes(tab)
+    reset_window_sizes(tab)
     return order
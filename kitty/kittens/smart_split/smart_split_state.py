@@ -8,20 +8,32 @@ helpers for waiting on window list changes after split or close actions.
 from __future__ import annotations
 
 import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
 
 from kitty.typing_compat import BossType
 
 from smart_split_kitty import tab_window_ids
 
 
+@dataclass(slots=True)
+class SmartSplitState:
+    """Per-OS-window kitten state: OS resize bookkeeping and the slot rotation order."""
+
+    expanded: bool
+    width_delta: int
+    height_delta: int
+    order: list[int] = field(default_factory=list)
+
+
 def ensure_state(
     boss: BossType,
     state_key: int | str,
     width_delta: int,
     height_delta: int,
-) -> dict:
+) -> SmartSplitState:
     """
-    Ensure a state dict exists for the given key and return it.
+    Ensure a state entry exists for the given key and return it.
 
     State is keyed by OS window id when available to prevent cross-window leakage.
     """
@@ -29,20 +41,39 @@ def ensure_state(
     if state_store is None:
         state_store = {}
         setattr(boss, "_smart_split_state", state_store)
-    state = state_store.setdefault(
-        state_key,
-        {
-            "expanded": False,
-            "width_delta": width_delta,
-            "height_delta": height_delta,
-            "order": [],
-        },
-    )
-    if not isinstance(state.get("order"), list):
-        state["order"] = []
+    state = state_store.get(state_key)
+    if not isinstance(state, SmartSplitState):
+        # Also replaces entries left behind by older versions of the kitten.
+        state = SmartSplitState(False, width_delta, height_delta)
+        state_store[state_key] = state
     return state
 
 
+def poll_until(
+    predicate: Callable[[], bool],
+    *,
+    timeout: float,
+    initial: float = 0.002,
+    max_step: float = 0.03,
+) -> bool:
+    """
+    Call `predicate` until it returns True or `timeout` seconds pass.
+
+    The first check is immediate; waits then start at `initial` and double up to
+    `max_step`, so conditions that are already met (or settle within a tick) return
+    within milliseconds instead of a fixed polling quantum.
+    """
+    deadline = time.monotonic() + timeout
+    step = initial
+    while not predicate():
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(step, remaining))
+        step = min(step * 2, max_step)
+    return True
+
+
 def wait_for_window_ids_change(tab, previous_ids: list[int]) -> list[int]:
     """
     Wait briefly for a split or close to update the window list.
@@ -50,23 +81,28 @@ def wait_for_window_ids_change(tab, previous_ids: list[int]) -> list[int]:
     This avoids racing the layout normalization step while the tab is mid-update.
     """
     current_ids = previous_ids
-    previous_set = set(previous_ids)
-    for _ in range(20):
-        # Poll in short intervals to keep close/split latency low.
+    previous_len = len(previous_ids)
+    previous_set = frozenset(previous_ids)
+
+    def changed() -> bool:
+        nonlocal current_ids
         current_ids = tab_window_ids(tab)
-        if set(current_ids) != previous_set or len(current_ids) != len(previous_ids):
-            return current_ids
-        time.sleep(0.03)
+        # Splits and closes change the count, so the set is only built on a tie.
+        return len(current_ids) != previous_len or set(current_ids) != previous_set
+
+    poll_until(changed, timeout=0.6)
     return current_ids
 
 
-def wait_for_window_ids_settle(tab) -> list[int]:
+def wait_for_window_ids_settle(tab, current_ids: list[int] | None = None) -> list[int]:
     """
     Wait for the window list to stop changing between polling intervals.
 
     This is used for the explicit normalize mode where the layout should be stable.
+    `current_ids` may pass a list the caller has just read to skip the first walk.
     """
-    current_ids = tab_window_ids(tab)
+    if current_ids is None:
+        current_ids = tab_window_ids(tab)
     for _ in range(12):
         # A brief pause gives kitty time to finish the layout update.
         time.sleep(0.03)
@@ -78,7 +114,7 @@ def wait_for_window_ids_settle(tab) -> list[int]:
 
 
 def sync_window_order(
-    state: dict,
+    state: SmartSplitState,
     current_ids: list[int],
     new_ids: list[int] | None = None,
     previous_ids: list[int] | None = None,
@@ -88,19 +124,14 @@ def sync_window_order(
 
     New windows are appended, while removed ids are filtered out.
     """
-    order = state.get("order")
-    if not isinstance(order, list):
-        order = []
-    if not order and previous_ids:
-        order = [wid for wid in previous_ids if wid in current_ids]
-    else:
-        order = [wid for wid in order if wid in current_ids]
-    if new_ids:
-        for wid in new_ids:
-            if wid in current_ids and wid not in order:
-                order.append(wid)
-    for wid in current_ids:
-        if wid not in order:
+    # Membership is tested against sets so the merge stays linear in the id count.
+    current_set = set(current_ids)
+    base = previous_ids if not state.order and previous_ids else state.order
+    order = [wid for wid in base if wid in current_set]
+    seen = set(order)
+    for wid in (*(new_ids or ()), *current_ids):
+        if wid not in seen and wid in current_set:
             order.append(wid)
-    state["order"] = order
+            seen.add(wid)
+    state.order = order
     return order